@@ -25,6 +25,8 @@ retrieving already evaluated rates.
     install_requires=[
         "beautifulsoup4~=4.12.3",
         "bs4",
+        "charset-normalizer",
+        "lxml~=5.2.2",
         "datedelta",
         "fake-useragent~=1.5.1",
         "fastapi",
@@ -3,6 +3,7 @@ from typing import Callable
 from fastapi import HTTPException
 
 from src.core.manager.sql_mgr import SqlMgr
+from src.core.model.metrics import FetchMetricsGetIn, TokenizationMetricsGetIn
 from src.core.model.resource import ResourcePredictGetIn, ResourcePredictRateIn
 from src.core.model.task import TaskCreateIn, TaskGetIn
 from src.core.model.user_key import (
@@ -28,6 +29,8 @@ RequestIn = (
     | KeyGetIn
     | KeyUpdatePeriodIn
     | KeyUpdateFrequencyIn
+    | FetchMetricsGetIn
+    | TokenizationMetricsGetIn
 )
 
 
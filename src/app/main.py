@@ -8,14 +8,16 @@ import uvicorn
 from fastapi import Depends, FastAPI, Header, Request
 from starlette.middleware.cors import CORSMiddleware
 
-from src.app.routers import general, keys, resources, tasks, users
+from src.app.routers import general, keys, metrics, resources, tasks, users
 from src.core.api.key_api import KeyApi
 from src.core.api.meta_tags import tags_metadata
+from src.core.api.metrics_api import MetricsApi
 from src.core.api.permissions import min_permissions
 from src.core.api.resource_api import ResourceApi
 from src.core.api.task_api import TaskApi
 from src.core.api.user_api import UserApi
 from src.core.app_error import AppError
+from src.core.classifier.model_registry import ModelWatcher
 from src.core.manager.key_mgr import KeyMgr
 from src.core.manager.sql_mgr import SqlMgr
 from src.core.manager.task_mgr import TaskMgr
@@ -31,6 +33,9 @@ def start_server(settings: dict) -> None:
 
     instances = instantiate(settings)
 
+    # load the nltk corpora now instead of on the first request
+    instances["token_mgr"].warm_up()
+
     resource_mgr = instances["resource_mgr"]
     user_mgr = UserMgr(settings)
     key_mgr = KeyMgr(settings, user_mgr)
@@ -40,10 +45,16 @@ def start_server(settings: dict) -> None:
     classifier.load_model()
     resource_mgr.classifier = classifier
 
+    # new model versions are loaded in the background and swapped in without a restart
+    reload_interval = settings["model"].get("registry", {}).get("reload_interval", 60)
+    if reload_interval:
+        ModelWatcher(classifier, reload_interval).start()
+
     resource_api = ResourceApi(settings, resource_mgr, key_mgr)
     task_api = TaskApi(settings, resource_mgr, key_mgr, task_mgr)
     user_api = UserApi(settings, resource_mgr, user_mgr, key_mgr)
     key_api = KeyApi(settings, resource_mgr, user_mgr, key_mgr)
+    metrics_api = MetricsApi(settings, resource_mgr)
 
     limits = settings["main"]["limits"]
 
@@ -123,6 +134,7 @@ def start_server(settings: dict) -> None:
     app.include_router(users.get_router(user_api))
     app.include_router(tasks.get_router(task_api))
     app.include_router(keys.get_router(key_api))
+    app.include_router(metrics.get_router(metrics_api))
 
     host = settings["app"]["host"]
     port = int(settings["app"]["port"])
@@ -0,0 +1,49 @@
+from fastapi import APIRouter, Response
+
+from src.app.dependencies import process_api_request
+from src.core.api.metrics_api import MetricsApi
+from src.core.model.metrics import (
+    FetchMetricsGetIn,
+    FetchMetricsGetOut,
+    TokenizationMetricsGetIn,
+    TokenizationMetricsGetOut,
+)
+
+
+def get_router(metrics_api: MetricsApi) -> APIRouter:
+    router = APIRouter()
+
+    @router.post(
+        "/Metrics/getFetchMetrics",
+        summary="returns fetch metrics like open circuit breakers, cached failures and browser pool usage",
+        description="By passing the appropriate options, returns domains with an open circuit breaker, "
+        "urls skipped after failures and usage statistics of the fetchers",
+        response_description="returns fetch metrics",
+        tags=["admin"],
+        response_model_exclude_none=True,
+    )
+    async def get_fetch_metrics(
+        data: FetchMetricsGetIn, response: Response
+    ) -> FetchMetricsGetOut:
+        res, status_code = process_api_request(metrics_api.get_fetch_metrics, data)
+        response.status_code = status_code
+        return res
+
+    @router.post(
+        "/Metrics/getTokenizationMetrics",
+        summary="returns hits and misses of the lemmatization and stemming caches",
+        description="Returns hits, misses, max size and current size of the lemmatization and stemming caches "
+        "of the tokenization",
+        response_description="returns tokenization metrics",
+        tags=["admin"],
+    )
+    async def get_tokenization_metrics(
+        data: TokenizationMetricsGetIn, response: Response
+    ) -> TokenizationMetricsGetOut:
+        res, status_code = process_api_request(
+            metrics_api.get_tokenization_metrics, data
+        )
+        response.status_code = status_code
+        return res
+
+    return router
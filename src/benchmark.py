@@ -0,0 +1,365 @@
+#!/usr/bin/python
+
+import argparse
+import copy
+import glob
+import os
+import posixpath
+import re
+import zlib
+
+import nltk
+from bs4 import BeautifulSoup
+
+from src.core.classifier.tx_classifier import TxClassifier
+from src.core.featureextractor.default_resource import DefaultResource
+from src.core.featureextractor.html_extractor import extract_document, link_href
+from src.core.manager.sql_mgr import SqlMgr
+from src.core.manager.tokenization_mgr import TokenizationMgr
+from src.core.webscrapper.webdrive_scrapper import WebDriveScrapper
+from src.utils.benchmark import measure, report, report_speedup
+from src.utils.classifier import get_classifier
+from src.utils.common import instantiate
+from src.utils.settings import read_settings
+
+curr_dir = os.path.dirname(__file__)
+
+
+def read_pages(settings: dict, input_dir: str | None) -> list:
+    """
+    Read html pages either from the given directory (*.html, *.htm) or from the page cache.
+    """
+    if input_dir:
+        files = glob.glob(os.path.join(input_dir, "*.htm*"))
+        pages = []
+        for file in sorted(files):
+            with open(file, "r", encoding="utf-8", errors="ignore") as f:
+                pages.append(f.read())
+        return pages
+
+    cache_dir = settings["main"].get("fetch", {}).get("cache", {}).get("dir", "cache")
+    blobs_dir = posixpath.normpath(os.path.join(curr_dir, cache_dir, "blobs"))
+    pages = []
+    for file in sorted(glob.glob(os.path.join(blobs_dir, "*", "*.z"))):
+        with open(file, "rb") as f:
+            pages.append(zlib.decompress(f.read()).decode("utf-8"))
+    return pages
+
+
+def legacy_collect_features(body: str) -> tuple:
+    """
+    The former BeautifulSoup (html.parser) based extraction, kept as a baseline.
+
+    Returns: language, features and links of the page
+    """
+    content = BeautifulSoup(body, "html.parser")
+
+    lang = None
+    element = content.find("html")
+    if element and element.get("lang"):
+        lang = element.get("lang")
+    else:
+        for element in content.find_all("meta"):
+            if element.get("property") and element.get("property") == "og:locale":
+                lang = element.get("content")
+                break
+
+    checked_lang = None
+    if lang:
+        lang = lang.split("_")[0] if lang.find("_") != -1 else lang.split("-")[0]
+        checked_lang = DefaultResource.lang_codes.get(lang)
+
+    features = []
+    if elements := content.find_all("title"):
+        features.append(elements[0].get_text())
+
+    for element in content.find_all("meta"):
+        if element.get("name") is not None and element.get("name") in ["description", "keywords"]:
+            if element.get("content"):
+                features.append(element.get("content"))
+        if element.get("property") is not None and element.get("property") in ["og:description", "og:title"]:
+            if element.get("content"):
+                features.append(element.get("content"))
+
+    for num in range(1, 4):
+        features += [element.get_text() for element in content.find_all("h" + str(num))]
+
+    ahrefs = [element.text for element in content.find_all("a") if element.text and element.text.strip()]
+    if ahrefs:
+        features.append(" ".join(ahrefs[: DefaultResource.limit_ahref]))
+
+    links = []
+    for link in content.find_all("a", attrs={"href": link_href}):
+        href = link.get("href")
+        if href not in links:
+            links.append(href)
+
+    return checked_lang or DefaultResource.default_lang, features, links
+
+
+def fast_collect_features(body: str) -> tuple:
+    document = extract_document(body)
+    feature_extractor = DefaultResource()
+    lang = feature_extractor.get_lang_from_content(document)
+    return lang, feature_extractor.collect_features(document), document.links
+
+
+def benchmark_html(settings: dict, args) -> None:
+    pages = read_pages(settings, args.input)
+    print(f"Pages: {len(pages)}")
+
+    suites = [("bs4 html.parser", legacy_collect_features), ("lxml single pass", fast_collect_features)]
+    summaries = []
+    results = []
+    for name, func in suites:
+        latencies = []
+        outputs = []
+        for _ in range(args.repeat):
+            outputs = []
+            for page in pages:
+                output, elapsed = measure(func, page)
+                outputs.append(output)
+                latencies.append(elapsed)
+        summaries.append(report(name, latencies))
+        results.append(outputs)
+
+    mismatches = sum(1 for legacy, fast in zip(*results) if legacy != fast)
+    print(f"Pages with different output: {mismatches}")
+    report_speedup(summaries[0], summaries[1])
+
+
+def legacy_tokenize(value: str, lang: str) -> str:
+    """
+    The former tokenization pipeline (stopword list scan, uncompiled patterns, several passes), kept as a
+    baseline.
+    """
+    value = re.sub(TokenizationMgr.specialchars, " ", value)
+    value = re.sub(r"\s+", " ", value)
+    value = value.replace("\x00", "")
+    value = value.lower()
+
+    tokens = value.split(" ")
+    try:
+        stopwords = nltk.corpus.stopwords.words(lang)
+    except IOError:
+        stopwords = nltk.corpus.stopwords.words(DefaultResource.default_lang)
+    tokens = [token for token in tokens if token not in stopwords]
+
+    if TokenizationMgr.do_lemmating is True:
+        tokens = [
+            TokenizationMgr.lemmatizer.lemmatize(token, TokenizationMgr.default_lemmating_speach_rule)
+            for token in tokens
+        ]
+
+    if TokenizationMgr.do_stemming is True:
+        tokens = [TokenizationMgr.stemmer.stem(token) for token in tokens]
+
+    def allow_token(token: str) -> bool:
+        if (
+            not token
+            or len(token) <= TokenizationMgr.min_token_len
+            or len(token) > TokenizationMgr.max_token_len
+            or token.isdigit()
+        ):
+            return False
+        return not any(
+            [
+                token in useless_word or useless_word in token
+                for useless_word in TokenizationMgr.useless_words
+            ]
+        )
+
+    value = " ".join([token for token in tokens if allow_token(token)])
+    return value[: TokenizationMgr.max_tokens_len].strip()
+
+
+def read_values(input_dir: str | None) -> list:
+    """
+    Read values to be tokenized: features of the html pages in the given directory or, if not given,
+    the lines of the training data sources.
+    """
+    if input_dir:
+        values = []
+        for page in read_pages({"main": {}}, input_dir):
+            values += fast_collect_features(page)[1]
+        return values
+
+    values = []
+    for file in sorted(glob.glob(os.path.join(curr_dir, "data", "*.txt"))):
+        with open(file, "r", encoding="utf-8") as f:
+            values += [line.strip() for line in f.readlines() if line.strip()]
+    return values
+
+
+def benchmark_tokenize(settings: dict, args) -> None:
+    values = read_values(args.input)
+    print(f"Values: {len(values)}")
+
+    token_mgr = TokenizationMgr(settings)
+    lang = DefaultResource.default_lang
+
+    # load stopwords and wordnet before measuring
+    legacy_tokenize("warm up", lang)
+    token_mgr.tokenize("warm up", lang)
+
+    suites = [("tokenize legacy", legacy_tokenize), ("tokenize compiled", token_mgr.tokenize)]
+    summaries = []
+    results = []
+    for name, func in suites:
+        latencies = []
+        outputs = []
+        for _ in range(args.repeat):
+            outputs = []
+            for value in values:
+                output, elapsed = measure(func, value, lang)
+                outputs.append(output)
+                latencies.append(elapsed)
+        summaries.append(report(name, latencies))
+        results.append(outputs)
+
+    mismatches = sum(1 for legacy, fast in zip(*results) if legacy != fast)
+    print(f"Values with different output: {mismatches}")
+    report_speedup(summaries[0], summaries[1])
+
+
+def benchmark_tokenize_many(settings: dict, args) -> None:
+    values = read_values(args.input)
+    print(f"Values: {len(values)}")
+
+    token_mgr = TokenizationMgr(settings)
+    token_mgr.warm_up()
+    lang = DefaultResource.default_lang
+
+    # the process pool is used for every batch of this suite
+    token_mgr.parallel_min_values = 0
+
+    def tokenize_each(batch: list) -> list:
+        return [token_mgr.tokenize(value, lang) for value in batch]
+
+    def tokenize_many(batch: list) -> list:
+        return token_mgr.tokenize_many(batch, lang)
+
+    suites = [("tokenize value by value", tokenize_each), ("tokenize_many", tokenize_many)]
+    summaries = []
+    results = []
+    for name, func in suites:
+        latencies = []
+        for _ in range(args.repeat):
+            outputs, elapsed = measure(func, values)
+            latencies.append(elapsed)
+        summaries.append(report(name, latencies))
+        results.append(outputs)
+
+    mismatches = sum(1 for each, many in zip(*results) if each != many)
+    print(f"Values with different output: {mismatches}")
+    report_speedup(summaries[0], summaries[1])
+
+
+def read_urls(urls_file: str | None) -> list:
+    if not urls_file:
+        raise ValueError("The file with urls to be fetched is not given, use --urls")
+
+    with open(urls_file, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f.readlines() if line.strip()]
+
+
+def benchmark_browser(settings: dict, args) -> None:
+    urls = read_urls(args.urls)
+    print(f"Urls: {len(urls)}")
+
+    summaries = []
+    for name, lean in [("browser full page load", False), ("browser lean page load", True)]:
+        browser_settings = copy.deepcopy(settings)
+        browser_settings["main"].setdefault("fetch", {}).setdefault("browser", {}).update(
+            {"lean": lean, "pool_size": 1}
+        )
+        scrapper = WebDriveScrapper(browser_settings)
+
+        # the first browser start is not part of the fetch time
+        with scrapper.pool.lease():
+            pass
+
+        latencies = []
+        failures = 0
+        for _ in range(args.repeat):
+            for url in urls:
+                try:
+                    _, elapsed = measure(scrapper.fetch, url)
+                    latencies.append(elapsed)
+                except Exception:
+                    failures += 1
+
+        scrapper.pool.close()
+        print(f"{name} failures: {failures}")
+        summaries.append(report(name, latencies))
+
+    report_speedup(summaries[0], summaries[1])
+
+
+def benchmark_classifier(settings: dict, args) -> None:
+    SqlMgr.init(settings, initial_table=False)
+    resource_mgr = instantiate(settings)["resource_mgr"]
+
+    modes = [mode.strip() for mode in args.modes.split(",")]
+    classifiers = []
+    for mode in modes:
+        mode_settings = copy.deepcopy(settings)
+        mode_settings["model"]["mode"] = mode
+        classifier = get_classifier(mode_settings, resource_mgr)
+        if not isinstance(classifier, TxClassifier):
+            raise ValueError(f"The mode {mode} cannot be benchmarked, only tf-idf modes are supported")
+        classifiers.append(classifier)
+
+    # all modes are trained and evaluated on the same split
+    sess = SqlMgr.create_session()
+    x_train, x_test, y_train, y_test = classifiers[0]._prepare_data(sess)
+    sess.close()
+    print(f"Train documents: {len(x_train)}, test documents: {len(x_test)}")
+
+    summaries = []
+    for mode, classifier in zip(modes, classifiers):
+        x_test_tfidf, train_time = measure(classifier._train_model, x_train, x_test, y_train)
+        accuracy = classifier._evaluate_model(x_test_tfidf, x_test, y_test)
+        print(f"{mode} training: {train_time:.2f}s  accuracy: {accuracy:.2f}%")
+
+        # a prediction of one resource: vectorization and model call
+        latencies = []
+        for _ in range(args.repeat):
+            for document in x_test:
+                _, elapsed = measure(
+                    lambda doc: classifier._predict_transformed(
+                        classifier.model, classifier.vectorizer.transform([doc])
+                    ),
+                    document,
+                )
+                latencies.append(elapsed)
+        summaries.append(report(f"{mode} predict", latencies))
+
+    report_speedup(summaries[0], summaries[-1])
+
+
+suites = {
+    "html": benchmark_html,
+    "browser": benchmark_browser,
+    "tokenize": benchmark_tokenize,
+    "tokenize_many": benchmark_tokenize_many,
+    "classifier": benchmark_classifier,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--settings", action="store", default="development.yaml")
+    parser.add_argument("--suite", action="store", choices=list(suites), required=True)
+    parser.add_argument("--input", action="store", default=None)
+    parser.add_argument("--urls", action="store", default=None)
+    parser.add_argument("--modes", action="store", default="tx,lineartx")
+    parser.add_argument("--repeat", action="store", type=int, default=1)
+    args = parser.parse_args()
+
+    settings = read_settings(args.settings)
+    suites[args.suite](settings, args)
+
+
+if __name__ == "__main__":
+    main()
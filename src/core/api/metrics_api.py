@@ -0,0 +1,30 @@
+from http import HTTPStatus
+
+from sqlalchemy.orm.session import Session
+
+from src.core.api.responser import Responser
+from src.core.manager.resource_mgr import ResourceMgr
+from src.core.model.metrics import (
+    FetchMetricsGetIn,
+    FetchMetricsGetOut,
+    TokenizationMetricsGetIn,
+    TokenizationMetricsGetOut,
+)
+
+
+class MetricsApi:
+    def __init__(self, settings: dict, resource_mgr: ResourceMgr):
+        self.settings = settings
+        self.resource_mgr = resource_mgr
+
+    def get_fetch_metrics(
+        self, sess: Session, data: FetchMetricsGetIn
+    ) -> (FetchMetricsGetOut, HTTPStatus):
+        metrics = self.resource_mgr.feature_extract_mgr.get_fetch_metrics(data.limit)
+        return Responser.create_fetch_metrics(metrics)
+
+    def get_tokenization_metrics(
+        self, sess: Session, data: TokenizationMetricsGetIn
+    ) -> (TokenizationMetricsGetOut, HTTPStatus):
+        metrics = self.resource_mgr.feature_extract_mgr.token_mgr.cache_info()
+        return Responser.create_tokenization_metrics(metrics)
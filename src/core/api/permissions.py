@@ -12,4 +12,6 @@ min_permissions = {
     "/Key/getKey": UserType.ADMIN,
     "/Key/updateKeyPeriod": UserType.ADMIN,
     "/Key/updateKeyFrequency": UserType.ADMIN,
+    "/Metrics/getFetchMetrics": UserType.ADMIN,
+    "/Metrics/getTokenizationMetrics": UserType.ADMIN,
 }
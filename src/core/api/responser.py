@@ -5,6 +5,7 @@ from typing import Any
 from src.core.entity.key import Key
 from src.core.entity.user import User
 from src.core.helper.rate import prediction_to_violation
+from src.core.model.metrics import FetchMetricsGetOut, TokenizationMetricsGetOut
 from src.core.model.resource import ResourcePredictGetOrRateOut
 from src.core.model.task import TaskCreateNotification, TaskCreateOut, TaskGetOut
 from src.core.model.user_key import UserCreateOut, UserKeyCreateOut, UserKeyDeleteOut
@@ -66,3 +67,13 @@ class Responser:
     @staticmethod
     def create_task_notification(task) -> (TaskCreateNotification, HTTPStatus):
         return TaskCreateNotification(uuid=task.uuid, status=task.status), HTTPStatus.OK
+
+    @staticmethod
+    def create_fetch_metrics(metrics: dict) -> (FetchMetricsGetOut, HTTPStatus):
+        return FetchMetricsGetOut(**metrics), HTTPStatus.OK
+
+    @staticmethod
+    def create_tokenization_metrics(
+        metrics: dict,
+    ) -> (TokenizationMetricsGetOut, HTTPStatus):
+        return TokenizationMetricsGetOut(**metrics), HTTPStatus.OK
@@ -38,6 +38,8 @@ class TaskApi:
             lang=data.lang,
             maxdepth=data.max_depth if data.max_depth else 1,
             recheck=data.recheck,
+            time_budget=self.task_mgr.get_time_budget(data.time_budget),
+            page_budget=self.task_mgr.get_page_budget(data.page_budget),
         )
 
         try:
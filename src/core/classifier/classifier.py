@@ -1,23 +1,47 @@
 import abc
 import os
+import threading
+import typing
+from dataclasses import dataclass, replace
 from enum import Enum
 
 import joblib
 import numpy as np
+from scipy import sparse
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.model_selection import train_test_split
 from sklearn.utils import shuffle
 from sqlalchemy.orm import Session
 
 from src.core.app_error import AppError
+from src.core.classifier.model_registry import ModelRegistry
 from src.core.manager.resource_mgr import ResourceMgr
 from src.utils.logger import logger
+from src.utils.settings import read_version
 
 
 class ClassifierType(Enum):
     TxClassifier = "tx"
     DLTxClassifier = "dltx"
     DLTxCNNClassifier = "dltxcnn"
+    LinearTxClassifier = "lineartx"
+    HashTxClassifier = "hashtx"
+
+
+@dataclass(frozen=True)
+class ModelBundle:
+    """
+    Vectorizer and model used together for predictions, swapped as a whole on reload.
+    """
+
+    vectorizer: typing.Any = None
+    model: typing.Any = None
+
+    # vocabulary of the vectorizer, column index -> term, None for a vectorizer without vocabulary
+    feature_names: typing.Any = None
+
+    # version of the model registry, "legacy" for models of the old dump files, None if not published
+    version: str | None = None
 
 
 class Classifier(abc.ABC):
@@ -44,16 +68,57 @@ class Classifier(abc.ABC):
         # "tfidf__ngram_range": [(1, 3),],
     }
 
+    # ClassifierType value, the models of a mode are versioned in own directory
+    mode: str = None
+
+    # resources vectorized and predicted with one model call
+    predict_batch_size = 256
+
+    # max top features pro resource
+    top_features_qty = 25
+
     def __init__(self, settings: dict, res_mgr: ResourceMgr):
         self.settings = settings
         self.res_mgr = res_mgr
 
-        self.model = None
-        self.vectorizer = None
+        self.bundle = ModelBundle()
+
+        # guards replacing the bundle by a reload against caching feature names on the replaced bundle
+        self.bundle_lock = threading.Lock()
 
+        # dump files of models trained before the model registry, loaded if the registry has no version
         self.vectorizer_dump_filename = None
         self.model_dump_filename = None
 
+        # set by _prepare_data, stored with the published model
+        self.train_metadata = {}
+
+        self.registry = ModelRegistry(
+            settings, self.mode, os.path.normpath(os.path.join(self.curr_dir, self.target_dir))
+        )
+
+    @property
+    def model(self):
+        return self.bundle.model
+
+    @model.setter
+    def model(self, model):
+        self.bundle = replace(self.bundle, model=model, version=None)
+
+    @property
+    def vectorizer(self):
+        return self.bundle.vectorizer
+
+    @vectorizer.setter
+    def vectorizer(self, vectorizer):
+        self.bundle = replace(
+            self.bundle, vectorizer=vectorizer, feature_names=None, version=None
+        )
+
+    @property
+    def model_version(self) -> str | None:
+        return self.bundle.version
+
     @staticmethod
     def get_synonyms_lexicon(path):
         synonyms_lexicon = {}
@@ -68,34 +133,83 @@ class Classifier(abc.ABC):
         return synonyms_lexicon
 
     def _prepare_data(self, sess: Session):
-        resources = self.res_mgr.get_checked_with_truerate_resources(sess)
-        docs_data, docs_target = self._prepare_resources_as_training_data(resources)
-        return self._prepare_dataset(docs_data, docs_target)
+        # documents of all resources are read with one query, resources without a document get it first
+        self.res_mgr.fill_missing_documents(sess)
+        documents = self.res_mgr.get_checked_with_truerate_documents(sess)
+        docs_data, docs_target = self._prepare_resources_as_training_data(documents)
+        x_train, x_test, y_train, y_test = self._prepare_dataset(docs_data, docs_target)
+
+        self.train_metadata = {
+            "app_version": read_version(),
+            "documents": len(docs_data),
+            "train_samples": len(x_train),
+            "test_samples": len(x_test),
+        }
+        return x_train, x_test, y_train, y_test
 
     def _save_model(self):
         if not self.vectorizer or not self.model:
             raise AppError.prediction_illegal_state()
 
-        with open(self.vectorizer_dump_filename, "wb") as f:
-            joblib.dump(self.vectorizer, f, compress=6)
+        version = self.registry.publish(
+            {"vectorizer": self.vectorizer, "model": self.model}, self.train_metadata
+        )
+        self.bundle = replace(self.bundle, version=version)
 
-        with open(self.model_dump_filename, "wb") as f:
-            joblib.dump(self.model, f, compress=6)
+    def _load_bundle(self, version: str | None = None) -> ModelBundle:
+        if version is None and self.registry.current_version() is None:
+            # no model is published yet, use the dump files of the former trainings
+            with open(self.vectorizer_dump_filename, "rb") as f:
+                vectorizer = joblib.load(f)
 
-    def load_model(self):
-        with open(self.vectorizer_dump_filename, "rb") as f:
-            self.vectorizer = joblib.load(f)
+            with open(self.model_dump_filename, "rb") as f:
+                model = joblib.load(f)
 
-        with open(self.model_dump_filename, "rb") as f:
-            self.model = joblib.load(f)
+            version = "legacy"
+        else:
+            objects, meta = self.registry.load(version)
+            vectorizer = objects.get("vectorizer")
+            model = objects.get("model")
+            version = meta["version"]
+
+        if not model or not vectorizer:
+            raise ValueError(
+                "Something went wrong, cannot load either a model or a vectorizer"
+            )
+
+        feature_names = None
+        if hasattr(vectorizer, "get_feature_names_out"):
+            feature_names = vectorizer.get_feature_names_out()
+
+        return ModelBundle(
+            vectorizer=vectorizer,
+            model=model,
+            feature_names=feature_names,
+            version=version,
+        )
 
-        if self.model and self.vectorizer:
-            logger.info("Model and vectorizer are loaded")
-            return
+    def load_model(self, version: str | None = None):
+        """
+        Loads the model of the version, by default the current version of the registry
+        :param version: Version of the model registry
+        """
+        # predictions take the bundle once, they see either the old or the new model
+        bundle = self._load_bundle(version)
+        with self.bundle_lock:
+            self.bundle = bundle
+        logger.info("Model and vectorizer are loaded, model version: %s", self.model_version)
 
-        raise ValueError(
-            "Something went wrong, cannot load either a model or a vectorizer"
-        )
+    def reload_model(self) -> bool:
+        """
+        Loads the current version of the registry if it differs from the loaded one
+        :return: True if another version is loaded
+        """
+        version = self.registry.current_version()
+        if version is None or version == self.model_version:
+            return False
+
+        self.load_model(version)
+        return True
 
     def _evaluate_model(
             self, x_test_tfidf, x_test, y_test, evaluate_two_classes=False, show_print=False
@@ -129,16 +243,15 @@ class Classifier(abc.ABC):
         return qty_docs_pos, qty_docs_neg
 
     @staticmethod
-    def _prepare_resources_as_training_data(resources):
+    def _prepare_resources_as_training_data(documents):
         docs_data = []  # np.memmap("/home/dim/test.mymemmap", mode="w+", shape=(,1))
         docs_target = []  # np.memmap("/home/dim/test.mymemmap", mode="w+")
-        for resource in resources:
-            if not resource.features:
+        for document, true_rate in documents:
+            if not document:
                 continue
 
-            resource_tokens = Classifier.get_feature_tokens(resource.features)
-            docs_data.append(resource_tokens)
-            docs_target.append(resource.true_rate)
+            docs_data.append(document)
+            docs_target.append(true_rate)
 
         return docs_data, docs_target
 
@@ -283,18 +396,67 @@ class Classifier(abc.ABC):
         x_test_tfidf = self.vectorizer.transform(x_test)
         return x_train_tfidf, x_test_tfidf
 
+    def get_feature_names(self, bundle: ModelBundle, documents: list):
+        """
+        Gets the terms of the columns of the vectorized documents
+        :param bundle: Bundle the documents are vectorized with
+        :param documents: Documents to be vectorized
+        :return: Column index -> term
+        """
+        if bundle.feature_names is not None:
+            return bundle.feature_names
+
+        # e.g. after a training in this process, computed once and kept with the bundle
+        feature_names = bundle.vectorizer.get_feature_names_out()
+        with self.bundle_lock:
+            if self.bundle is bundle:
+                self.bundle = replace(bundle, feature_names=feature_names)
+        return feature_names
+
+    @staticmethod
+    def get_top_positions(values, indices, qty: int):
+        """
+        Gets the positions of the qty highest values of a sparse row, ordered by value and then by column index,
+        both descending (the order of a reversed stable argsort over the dense row).
+        The former reversed default argsort over the dense row ordered equal values in no defined order, so
+        features tied at the cut-off can differ from the ones it picked
+        :param values: Non-zero values of the row
+        :param indices: Column indices of the values
+        :param qty: Max amount of positions
+        :return: Positions of the highest values in the given arrays
+        """
+        positions = np.arange(len(values))
+        if len(values) > qty:
+            # the qty-th highest value, all values tied with it are candidates and ordered below
+            kth = len(values) - qty
+            threshold = np.partition(values, kth)[kth]
+            positions = positions[values >= threshold]
+
+        order = np.lexsort((-indices[positions], -values[positions]))[:qty]
+        return positions[order]
+
     @staticmethod
     def get_top_features_pro_samples(feature_names, x_train_tfidf):
-        x_data = x_train_tfidf.toarray()
+        # rows are read from the sparse matrix, a row is never expanded to the whole vocabulary
+        x_data = sparse.csr_matrix(x_train_tfidf)
         top_features = []
         rate_diff = None
-        for x_row in x_data:
+        for row in range(x_data.shape[0]):
+            row_start, row_end = x_data.indptr[row], x_data.indptr[row + 1]
+            row_values = x_data.data[row_start:row_end]
+            row_indices = x_data.indices[row_start:row_end]
+
+            nonzero = row_values != 0.0
+            row_values = row_values[nonzero]
+            row_indices = row_indices[nonzero]
+
             top_features_with_tfids = {}
-            tfids_top_indexes = np.argsort(x_row)[::-1][:25]
-            for tfids_index in tfids_top_indexes:
-                feature_rate = x_row[tfids_index]
-                if feature_rate == 0.0:
-                    continue
+            tfids_top_positions = Classifier.get_top_positions(
+                row_values, row_indices, Classifier.top_features_qty
+            )
+            for tfids_position in tfids_top_positions:
+                tfids_index = row_indices[tfids_position]
+                feature_rate = row_values[tfids_position]
 
                 if rate_diff is None:
                     rate_diff = round(1.00 - feature_rate, 2)
@@ -310,6 +472,22 @@ class Classifier(abc.ABC):
 
         return top_features
 
+    @staticmethod
+    def get_resource_document(resource) -> str | None:
+        """
+        Gets the joined tokens of the resource: the stored document or, for a resource extracted before documents
+        were stored, the tokens of its features
+        :param resource: Resource to be predicted
+        :return: Joined tokens or None if the resource has no features
+        """
+        if resource.document is not None:
+            return resource.document
+
+        if resource.features:
+            return Classifier.get_feature_tokens(resource.features)
+
+        return None
+
     @staticmethod
     def get_feature_tokens(features: list) -> str:
         """
@@ -323,6 +501,70 @@ class Classifier(abc.ABC):
         # Exp. page_title , header 1 , header 2 etc. in 1 sentence
         return " ".join(feature_tokens)
 
+    def predict_resource(self, resource, show_top_features=False):
+        return self.predict_resources([resource], show_top_features)[0]
+
+    def predict_resources(self, resources: list, show_top_features: bool = False) -> list:
+        """
+        Predicts the resources in batches of `predict_batch_size`, every batch is vectorized in one matrix and
+        predicted with one model call
+        :param resources: Resources to be predicted
+        :param show_top_features: collect the top features of every resource
+        :return: (prediction, top features) pro resource in the order of the resources, both are None for a
+            resource without features
+        """
+        # the same vectorizer and model for all resources, even if a new version is swapped in meanwhile
+        bundle = self.bundle
+
+        logger.info(
+            "begin classifier predict_resources: %s, model version: %s", len(resources), bundle.version
+        )
+
+        results = [(None, None)] * len(resources)
+
+        documents = [Classifier.get_resource_document(resource) for resource in resources]
+        indexes = [index for index, document in enumerate(documents) if document]
+
+        feature_names = None
+        if show_top_features:
+            feature_names = self.get_feature_names(bundle, [documents[index] for index in indexes])
+
+        for start in range(0, len(indexes), self.predict_batch_size):
+            batch_indexes = indexes[start : start + self.predict_batch_size]
+            for index in batch_indexes:
+                logger.info("Features found: %s", documents[index])
+
+            x_test_transformed = bundle.vectorizer.transform(
+                [documents[index] for index in batch_indexes]
+            )
+            y_pred = self._predict_transformed(bundle.model, x_test_transformed)
+
+            for row, index in enumerate(batch_indexes):
+                top_features = None
+                # row by row, the rates of the top features are relative to the best feature of the resource
+                if show_top_features and (
+                    top_features_pro_samples := Classifier.get_top_features_pro_samples(
+                        feature_names, x_test_transformed[row]
+                    )
+                ):
+                    top_features = top_features_pro_samples[0]
+
+                # same shape as predicted for a single resource
+                results[index] = (y_pred[row : row + 1], top_features)
+
+        logger.info("end classifier predict_resources, model version: %s", bundle.version)
+        return results
+
+    @abc.abstractmethod
+    def _predict_transformed(self, model, x_test_transformed):
+        """
+        Predicts the vectorized resources with one model call
+        :param model: Model of the bundle the resources are vectorized with
+        :param x_test_transformed: Vectorized documents, one row pro resource
+        :return: Predictions, one row pro resource
+        """
+        pass
+
     @abc.abstractmethod
     def train(self, sess: Session, save_model=True):
         pass
@@ -7,10 +7,12 @@ from keras.api.layers import Dense, Dropout
 from sklearn import logger, metrics
 from sqlalchemy.orm import Session
 
-from src.core.classifier.classifier import Classifier
+from src.core.classifier.classifier import Classifier, ClassifierType
 
 
 class DLTxClassifier(Classifier):
+    mode = ClassifierType.DLTxClassifier.value
+
     def __init__(self, settings, res_mgr):
         Classifier.__init__(self, settings, res_mgr)
 
@@ -79,25 +81,6 @@ class DLTxClassifier(Classifier):
         logger.info(metrics.classification_report(y_test, predicted))
         logger.info(metrics.accuracy_score(y_test, predicted))
 
-    def predict_resource(self, resource, show_top_features=False):
-        logger.info("begin classifier predict_resource")
-
-        y_pred = None
-        top_features = None
-
-        if resource.features:
-            feature_tokens_str = Classifier.get_feature_tokens(resource.features)
-            logger.info("Features found: %s", feature_tokens_str)
-            x_test_transformed = self.vectorizer.transform([feature_tokens_str])
-            if show_top_features:
-                feature_names = self.vectorizer.get_feature_names_out()
-                top_features_pro_samples = Classifier.get_top_features_pro_samples(
-                    feature_names, x_test_transformed
-                )
-                top_features = top_features_pro_samples[0]
-
-            x_test_tfidf_reshaped = np.expand_dims(x_test_transformed.toarray(), axis=2)
-            y_pred = self.model.predict(x_test_tfidf_reshaped)
-
-        logger.info("end classifier predict_resource")
-        return y_pred, top_features
+    def _predict_transformed(self, model, x_test_transformed):
+        x_test_tfidf_reshaped = np.expand_dims(x_test_transformed.toarray(), axis=2)
+        return model.predict(x_test_tfidf_reshaped)
@@ -7,11 +7,13 @@ from keras.api.layers import Conv1D, Dense, Dropout, Flatten, MaxPooling1D
 from sklearn import metrics
 from sqlalchemy.orm import Session
 
-from src.core.classifier.classifier import Classifier
+from src.core.classifier.classifier import Classifier, ClassifierType
 from src.utils.logger import logger
 
 
 class DLTxCNNClassifier(Classifier):
+    mode = ClassifierType.DLTxCNNClassifier.value
+
     def __init__(self, settings, res_mgr):
         Classifier.__init__(self, settings, res_mgr)
 
@@ -97,26 +99,7 @@ class DLTxCNNClassifier(Classifier):
         if save_model:
             self._save_model()
 
-    def predict_resource(self, resource, show_top_features=False):
-        logger.info("begin classifier predict_resource")
-
-        y_pred = None
-        top_features = None
-
-        if resource.features:
-            feature_tokens_str = Classifier.get_feature_tokens(resource.features)
-            logger.info("Features found: %s", feature_tokens_str)
-            x_test_transformed = self.vectorizer.transform([feature_tokens_str])
-            if show_top_features:
-                feature_names = self.vectorizer.get_feature_names_out()
-                top_features_pro_samples = Classifier.get_top_features_pro_samples(
-                    feature_names, x_test_transformed
-                )
-                top_features = top_features_pro_samples[0]
-
-            x_test_tfidf_reshaped = np.expand_dims(x_test_transformed.toarray(), axis=2)
-            predict_x = self.model.predict(x_test_tfidf_reshaped)
-            y_pred = np.argmax(predict_x, axis=1)
-
-        logger.info("end classifier predict_resource")
-        return y_pred, top_features
+    def _predict_transformed(self, model, x_test_transformed):
+        x_test_tfidf_reshaped = np.expand_dims(x_test_transformed.toarray(), axis=2)
+        predict_x = model.predict(x_test_tfidf_reshaped)
+        return np.argmax(predict_x, axis=1)
@@ -0,0 +1,157 @@
+import datetime
+import os
+import posixpath
+
+from sklearn.feature_extraction import FeatureHasher
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import SGDClassifier
+from sqlalchemy.orm import Session
+
+from src.core.classifier.classifier import Classifier, ClassifierType, ModelBundle
+from src.core.classifier.tx_classifier import TxClassifier
+from src.core.manager.resource_mgr import ResourceMgr
+from src.utils.logger import logger
+
+
+class HashTxClassifier(TxClassifier):
+    """
+    Online linear classifier on hashed token n-grams.
+
+    The hashing vectorizer has no vocabulary: it takes no memory, is not fitted and is the same for all
+    trainings. So a published model can be trained further with `partial_fit`: a training folds the resources
+    labeled since the current version in (the label time of the latest learned resource is stored as
+    `labeled_until` in the training metadata, see `Resource.labeled_at`). A full training from scratch (`fit`,
+    several epochs) runs if there is no current version or if `model.train.full` is set.
+    """
+
+    mode = ClassifierType.HashTxClassifier.value
+
+    n_features_default = 2**20
+    ngram_range_default = (1, 2)
+    alpha_default = 0.00001
+
+    def __init__(self, settings: dict, res_mgr: ResourceMgr):
+        TxClassifier.__init__(self, settings, res_mgr)
+
+        self.vectorizer_dump_filename = posixpath.normpath(
+            os.path.join(self.curr_dir, f"{self.target_dir}/hashtx_vectorizerDump.pkl")
+        )
+
+        self.model_dump_filename = posixpath.normpath(
+            os.path.join(self.curr_dir, f"{self.target_dir}/hashtx_modelDump.pkl")
+        )
+
+        hashtx_settings = settings["model"].get("hashtx", {})
+        self.n_features = hashtx_settings.get("n_features", self.n_features_default)
+        self.ngram_range = tuple(hashtx_settings.get("ngram_range", self.ngram_range_default))
+        self.alpha = hashtx_settings.get("alpha", self.alpha_default)
+
+    def _build_vectorizer(self) -> HashingVectorizer:
+        return HashingVectorizer(
+            n_features=self.n_features,
+            ngram_range=self.ngram_range,
+            alternate_sign=False,
+        )
+
+    def _build_model(self) -> SGDClassifier:
+        # modified huber gives probabilities as well
+        return SGDClassifier(
+            loss="modified_huber", alpha=self.alpha, random_state=self.random_state
+        )
+
+    def train(self, sess: Session, save_model: bool = True):
+        if self.settings["model"]["train"].get("full", False) or self.registry.current_version() is None:
+            logger.info("Train the model of mode %s from scratch", self.mode)
+            TxClassifier.train(self, sess, save_model)
+            return
+
+        self._train_incremental(sess, save_model)
+
+    def _prepare_data(self, sess: Session):
+        # resources labeled later are folded in by the next incremental training
+        labeled_until = self.res_mgr.get_truerate_watermark(sess)
+
+        x_train, x_test, y_train, y_test = Classifier._prepare_data(self, sess)
+
+        self.train_metadata["labeled_until"] = labeled_until.isoformat() if labeled_until else None
+        self.train_metadata["incremental"] = False
+        return x_train, x_test, y_train, y_test
+
+    def _train_model(self, x_train, x_test, y_train):
+        self.vectorizer = self._build_vectorizer()
+        x_train_hashed = self.vectorizer.transform(x_train)
+        x_test_hashed = self.vectorizer.transform(x_test)
+
+        # epochs until the loss converges, partial_fit is one epoch only
+        self.model = self._build_model()
+        self.model.fit(x_train_hashed, y_train)
+        return x_test_hashed
+
+    def _train_incremental(self, sess: Session, save_model: bool = True):
+        self.load_model()
+        base_version = self.model_version
+        base_metadata = self.registry.get_meta(base_version)["metadata"]
+
+        # models trained before the label times were stored have no `labeled_until`, they learned none of
+        # the resources with a label time
+        labeled_after = base_metadata.get("labeled_until")
+        labeled_after = datetime.datetime.fromisoformat(labeled_after) if labeled_after else None
+        labeled_until = self.res_mgr.get_truerate_watermark(sess)
+        if labeled_until is None or (labeled_after is not None and labeled_until <= labeled_after):
+            logger.info("There are no resources labeled since the model version %s", base_version)
+            return
+
+        self.res_mgr.fill_missing_documents(sess)
+        documents = self.res_mgr.get_checked_with_truerate_documents(
+            sess, labeled_after=labeled_after, labeled_until=labeled_until
+        )
+        docs_data, docs_target = self._prepare_resources_as_training_data(documents)
+        if not docs_data:
+            logger.info("There are no resources labeled since the model version %s", base_version)
+            return
+
+        # partial_fit knows only the classes of the first fit, a new true-rate needs a training from scratch
+        if unknown_classes := set(docs_target) - set(self.model.classes_):
+            logger.warning(
+                "The true-rates %s are unknown to the model version %s, train the model from scratch",
+                sorted(unknown_classes),
+                base_version,
+            )
+            TxClassifier.train(self, sess, save_model)
+            return
+
+        logger.info(
+            "Fold %s labeled resources into the model version %s", len(docs_data), base_version
+        )
+        self.model.partial_fit(self.vectorizer.transform(docs_data), docs_target)
+
+        self.train_metadata = {
+            "app_version": base_metadata.get("app_version"),
+            "documents": len(docs_data),
+            "labeled_until": labeled_until.isoformat(),
+            "incremental": True,
+            "base_version": base_version,
+        }
+
+        if save_model:
+            self._save_model()
+
+    def get_feature_names(self, bundle: ModelBundle, documents: list):
+        # the hashing has no vocabulary, hash the terms of the documents to know their columns
+        # (on a collision the term seen first is shown)
+        analyzer = bundle.vectorizer.build_analyzer()
+        terms = list(dict.fromkeys(term for document in documents for term in analyzer(document)))
+        if not terms:
+            return {}
+
+        hasher = FeatureHasher(
+            n_features=bundle.vectorizer.n_features,
+            input_type="string",
+            alternate_sign=bundle.vectorizer.alternate_sign,
+        )
+        columns = hasher.transform([[term] for term in terms]).indices
+
+        feature_names = {}
+        for term, column in zip(terms, columns):
+            feature_names.setdefault(column, term)
+        return feature_names
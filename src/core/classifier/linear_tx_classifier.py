@@ -0,0 +1,62 @@
+import os
+import posixpath
+
+from sklearn.calibration import CalibratedClassifierCV
+from sklearn.model_selection import GridSearchCV
+from sklearn.pipeline import Pipeline
+from sklearn.svm import LinearSVC
+
+from src.core.classifier.classifier import ClassifierType
+from src.core.classifier.tx_classifier import TxClassifier
+from src.core.manager.resource_mgr import ResourceMgr
+
+
+class LinearTxClassifier(TxClassifier):
+    """
+    Linear SVM on the tf-idf features of TxClassifier.
+
+    A prediction is one dot product pro class, independent of the amount of training data, and the training
+    scales linearly with the corpus, unlike the support vectors of the RBF kernel. The scores are calibrated
+    with a sigmoid, so the model gives probabilities as well.
+    """
+
+    mode = ClassifierType.LinearTxClassifier.value
+
+    calibration_cv = 3
+
+    def __init__(self, settings: dict, res_mgr: ResourceMgr):
+        TxClassifier.__init__(self, settings, res_mgr)
+
+        self.vectorizer_dump_filename = posixpath.normpath(
+            os.path.join(self.curr_dir, f"{self.target_dir}/lineartx_vectorizerDump.pkl")
+        )
+
+        self.model_dump_filename = posixpath.normpath(
+            os.path.join(self.curr_dir, f"{self.target_dir}/lineartx_modelDump.pkl")
+        )
+
+    def _train_model(self, x_train, x_test, y_train):
+        # Hyperparams different combinations, copies of the shared class attributes
+        train_pipe_elements = self.train_pipe_elements + [("svc", LinearSVC())]
+        train_pipe_parameters = dict(self.train_pipe_parameters)
+        train_pipe_parameters["svc__C"] = [0.1, 0.5, 1, 5, 10]
+        pipeline = Pipeline(train_pipe_elements)
+        gs = GridSearchCV(pipeline, train_pipe_parameters, n_jobs=3, cv=3)
+        gs.fit(x_train, y_train)
+
+        best_c = gs.best_params_["svc__C"]
+
+        tfid_vect_params = {
+            "ngram_range": gs.best_params_["tfidf__ngram_range"],
+            "min_df": gs.best_params_["tfidf__min_df"],
+            "max_df": gs.best_params_["tfidf__max_df"],
+        }
+        x_train_tfidf, x_test_tfidf = self._transform_data(
+            x_train, x_test, tfid_vect_params
+        )
+
+        self.model = CalibratedClassifierCV(
+            LinearSVC(C=best_c), method="sigmoid", cv=self.calibration_cv
+        )
+        self.model.fit(x_train_tfidf, y_train)
+        return x_test_tfidf
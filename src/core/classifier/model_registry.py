@@ -0,0 +1,236 @@
+import datetime
+import hashlib
+import json
+import os
+import shutil
+import threading
+
+import joblib
+
+from src.utils.logger import logger
+
+
+def file_checksum(file_path: str) -> str:
+    sha256 = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def write_json_atomically(file_path: str, data: dict) -> None:
+    # readers see either the old or the new file, never a partial one
+    tmp_file_path = f"{file_path}.tmp"
+    with open(tmp_file_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_file_path, file_path)
+
+
+def version_key(version: str) -> tuple[str, int]:
+    # versions published in the same second get a numeric suffix, `.10` is later than `.2`
+    timestamp, _, suffix = version.partition(".")
+    return timestamp, int(suffix) if suffix.isdigit() else 0
+
+
+class ModelRegistry:
+    """
+    Versioned store of the trained models of one classifier mode.
+
+    Every training publishes a version directory `<target_dir>/<mode>/<version>` with the dumped objects and
+    `meta.json` (version, mode, creation date, training metadata and sha256 checksums of the dumps).
+    `current.json` points to the current and the previous version and is replaced atomically, so a process
+    loading a model never sees a half written version. A rollback makes the previous version current again.
+    """
+
+    meta_filename = "meta.json"
+    pointer_filename = "current.json"
+
+    keep_default = 5
+
+    def __init__(self, settings: dict, mode: str, target_dir: str):
+        self.settings = settings
+        self.mode = mode
+        self.registry_dir = os.path.join(target_dir, mode)
+
+        registry_settings = settings["model"].get("registry", {})
+        self.keep = registry_settings.get("keep", self.keep_default)
+
+    def _version_dir(self, version: str) -> str:
+        return os.path.join(self.registry_dir, version)
+
+    def get_pointer(self) -> dict:
+        pointer_file_path = os.path.join(self.registry_dir, self.pointer_filename)
+        if not os.path.isfile(pointer_file_path):
+            return {}
+
+        with open(pointer_file_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def current_version(self) -> str | None:
+        return self.get_pointer().get("current")
+
+    def versions(self) -> list:
+        """
+        Returns: published versions, the oldest first
+        """
+        if not os.path.isdir(self.registry_dir):
+            return []
+
+        return sorted(
+            (
+                version
+                for version in os.listdir(self.registry_dir)
+                if os.path.isfile(os.path.join(self._version_dir(version), self.meta_filename))
+            ),
+            key=version_key,
+        )
+
+    def get_meta(self, version: str) -> dict:
+        meta_file_path = os.path.join(self._version_dir(version), self.meta_filename)
+        if not os.path.isfile(meta_file_path):
+            raise ValueError(f"The model version {version} does not exist in {self.registry_dir}")
+
+        with open(meta_file_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def publish(self, objects: dict, metadata: dict | None = None) -> str:
+        """
+        Dump the objects as a new version and make it current.
+
+        Args:
+            objects: objects to be dumped by name, e.g. {"vectorizer": ..., "model": ...}
+            metadata: training metadata stored in meta.json
+
+        Returns: the new version
+        """
+        os.makedirs(self.registry_dir, exist_ok=True)
+
+        version = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+        suffix = 1
+        while os.path.exists(self._version_dir(version)):
+            version = f"{version.split('.')[0]}.{suffix}"
+            suffix += 1
+
+        # the version directory appears at once with all files
+        tmp_version_dir = os.path.join(self.registry_dir, f".{version}.tmp")
+        os.makedirs(tmp_version_dir)
+
+        checksums = {}
+        for name, obj in objects.items():
+            dump_file_path = os.path.join(tmp_version_dir, f"{name}.pkl")
+            with open(dump_file_path, "wb") as f:
+                joblib.dump(obj, f, compress=6)
+            checksums[name] = file_checksum(dump_file_path)
+
+        write_json_atomically(
+            os.path.join(tmp_version_dir, self.meta_filename),
+            {
+                "version": version,
+                "mode": self.mode,
+                "created": datetime.datetime.now().isoformat(timespec="seconds"),
+                "checksums": checksums,
+                "metadata": metadata or {},
+            },
+        )
+        os.rename(tmp_version_dir, self._version_dir(version))
+
+        self.activate(version)
+        self._prune()
+
+        logger.info("Model version %s of mode %s is published", version, self.mode)
+        return version
+
+    def load(self, version: str | None = None) -> tuple[dict, dict]:
+        """
+        Load the dumped objects of the version after verifying their checksums.
+
+        Args:
+            version: version to be loaded, the current version if not given
+
+        Returns: loaded objects by name and the meta data of the version
+
+        Raises:
+            ValueError: there is no such version or a dump does not match its checksum
+        """
+        version = version or self.current_version()
+        if version is None:
+            raise ValueError(f"There is no current model version in {self.registry_dir}")
+
+        meta = self.get_meta(version)
+
+        objects = {}
+        for name, checksum in meta["checksums"].items():
+            dump_file_path = os.path.join(self._version_dir(version), f"{name}.pkl")
+            if file_checksum(dump_file_path) != checksum:
+                raise ValueError(f"The {name} of the model version {version} does not match its checksum")
+
+            with open(dump_file_path, "rb") as f:
+                objects[name] = joblib.load(f)
+
+        return objects, meta
+
+    def activate(self, version: str) -> None:
+        """
+        Make the version current, the current version becomes the previous one.
+        """
+        self.get_meta(version)
+
+        current = self.current_version()
+        if current == version:
+            return
+
+        write_json_atomically(
+            os.path.join(self.registry_dir, self.pointer_filename),
+            {"current": version, "previous": current},
+        )
+        logger.info("Model version %s of mode %s is current, previous: %s", version, self.mode, current)
+
+    def rollback(self) -> str:
+        """
+        Make the previous version current again.
+
+        Returns: the current version after the rollback
+
+        Raises:
+            ValueError: there is no previous version
+        """
+        previous = self.get_pointer().get("previous")
+        if previous is None:
+            raise ValueError(f"There is no previous model version in {self.registry_dir}")
+
+        self.activate(previous)
+        return previous
+
+    def _prune(self) -> None:
+        pointer = self.get_pointer()
+        protected = {pointer.get("current"), pointer.get("previous")}
+
+        versions = self.versions()
+        for version in versions[: max(0, len(versions) - self.keep)]:
+            if version not in protected:
+                shutil.rmtree(self._version_dir(version), ignore_errors=True)
+                logger.info("Model version %s of mode %s is removed", version, self.mode)
+
+
+class ModelWatcher(threading.Thread):
+    """
+    Checks the registry of the classifier every `interval` seconds and loads a new current version (or
+    a rollback) in the background, the classifier swaps it in at once.
+    """
+
+    def __init__(self, classifier, interval: int):
+        super().__init__(name="ModelWatcher", daemon=True)
+        self.classifier = classifier
+        self.interval = interval
+        self.stopped = threading.Event()
+
+    def run(self) -> None:
+        while not self.stopped.wait(self.interval):
+            try:
+                self.classifier.reload_model()
+            except Exception as e:
+                # keep the loaded model, the next check tries again
+                logger.error("Model cannot be reloaded: %s", str(e))
+
+    def stop(self) -> None:
+        self.stopped.set()
@@ -8,12 +8,14 @@ from sklearn.pipeline import Pipeline
 from sklearn.svm import SVC
 from sqlalchemy.orm import Session
 
-from src.core.classifier.classifier import Classifier
+from src.core.classifier.classifier import Classifier, ClassifierType
 from src.core.manager.resource_mgr import ResourceMgr
 from src.utils.logger import logger
 
 
 class TxClassifier(Classifier):
+    mode = ClassifierType.TxClassifier.value
+
     def __init__(self, settings: dict, res_mgr: ResourceMgr):
         Classifier.__init__(self, settings, res_mgr)
 
@@ -44,15 +46,16 @@ class TxClassifier(Classifier):
         2. https://stats.stackexchange.com/questions/31066/what-is-the-influence-of-c-in-svms-with-linear-kernel
         """
 
-        # Hyperparams different combinations
-        self.train_pipe_elements.append(("svc", SVC()))
-        self.train_pipe_parameters["svc__kernel"] = ["rbf"]
-        self.train_pipe_parameters["svc__C"] = [120, 150, 160, 180]
-        self.train_pipe_parameters["svc__gamma"] = [0.001, 0.005, 0.01, 0.05]
-        # self.train_pipe_parameters["svc__C"] = [160]
-        # self.train_pipe_parameters["svc__gamma"] = [0.005]
-        pipeline = Pipeline(self.train_pipe_elements)
-        gs = GridSearchCV(pipeline, self.train_pipe_parameters, n_jobs=3, cv=3)
+        # Hyperparams different combinations, copies of the shared class attributes
+        train_pipe_elements = self.train_pipe_elements + [("svc", SVC())]
+        train_pipe_parameters = dict(self.train_pipe_parameters)
+        train_pipe_parameters["svc__kernel"] = ["rbf"]
+        train_pipe_parameters["svc__C"] = [120, 150, 160, 180]
+        train_pipe_parameters["svc__gamma"] = [0.001, 0.005, 0.01, 0.05]
+        # train_pipe_parameters["svc__C"] = [160]
+        # train_pipe_parameters["svc__gamma"] = [0.005]
+        pipeline = Pipeline(train_pipe_elements)
+        gs = GridSearchCV(pipeline, train_pipe_parameters, n_jobs=3, cv=3)
         gs.fit(x_train, y_train)
 
         best_c = gs.best_params_["svc__C"]
@@ -125,24 +128,5 @@ class TxClassifier(Classifier):
         logger.info("Total elements: {}".format(len(y_t)))
         logger.info("Accuracy with 2 classes: %s", round(accuracy_predictions, 2))
 
-    def predict_resource(self, resource, show_top_features=False):
-        logger.info("begin classifier predict_resource")
-
-        y_pred = None
-        top_features = None
-
-        if resource.features:
-            feature_tokens_str = Classifier.get_feature_tokens(resource.features)
-            logger.info("Features found: %s", feature_tokens_str)
-            x_test_transformed = self.vectorizer.transform([feature_tokens_str])
-            if show_top_features:
-                feature_names = self.vectorizer.get_feature_names_out()
-                if top_features_pro_samples := Classifier.get_top_features_pro_samples(
-                    feature_names, x_test_transformed
-                ):
-                    top_features = top_features_pro_samples[0]
-
-            y_pred = self.model.predict(x_test_transformed)
-
-        logger.info("end classifier predict_resource")
-        return y_pred, top_features
+    def _predict_transformed(self, model, x_test_transformed):
+        return model.predict(x_test_transformed)
@@ -0,0 +1,40 @@
+import datetime
+
+from sqlalchemy import Column, DateTime, Float, Integer, String, UniqueConstraint
+
+from src.core.manager.sql_mgr import SqlMgr
+
+
+class FetcherStat(SqlMgr.base):
+    __tablename__ = "fetcherstats"
+
+    # one row pro domain and fetcher, outcomes are added up with an upsert
+    __table_args__ = (
+        UniqueConstraint("domain", "fetcher", name="uq_fetcherstats_domain_fetcher"),
+    )
+
+    id = Column("id", Integer, primary_key=True)
+
+    domain = Column("domain", String(255), nullable=False)
+
+    # [RequestsScrapper, WebDriveScrapper]
+    fetcher = Column("fetcher", String(50), nullable=False)
+
+    attempts = Column("attempts", Integer, nullable=False, default=0)
+
+    # fetches which gave a page (and features, if they were extracted)
+    successes = Column("successes", Integer, nullable=False, default=0)
+
+    # sum of extracted features and amount of fetches they were counted for
+    features_total = Column("features_total", Integer, nullable=False, default=0)
+    features_samples = Column("features_samples", Integer, nullable=False, default=0)
+
+    # sum of fetch latencies in seconds
+    latency_total = Column("latency_total", Float, nullable=False, default=0.0)
+
+    last_modified = Column(
+        "last_modified",
+        DateTime,
+        default=datetime.datetime.now,
+        onupdate=datetime.datetime.now,
+    )
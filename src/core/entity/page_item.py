@@ -24,6 +24,8 @@ class PageItem:
             # this field will be removed while giving back as a result
             self.resource_id = page_item_data["resource_id"]
 
+            self.skipped = page_item_data.get("skipped", False)
+
             if "top_features" in page_item_data:
                 if isinstance(page_item_data["top_features"], str):
                     self.top_features = json.loads(page_item_data["top_features"])
@@ -45,6 +47,9 @@ class PageItem:
 
             self.top_features = []
 
+            # the page is not fetched because the crawl budget of the task ran out
+            self.skipped = False
+
             self.pages = []
 
     def create_pages_by_links(self, links):
@@ -54,6 +59,9 @@ class PageItem:
     def clean_fields(self, show_top_features=False):
         delattr(self, "resource_id")
 
+        if not self.skipped:
+            delattr(self, "skipped")
+
         if not self.pages:
             delattr(self, "pages")
 
@@ -55,6 +55,16 @@ class Resource(SqlMgr.base):
 
     top_features = Column("top_features", Text, unique=False, nullable=True)
 
+    # hash of the page content the features were extracted from
+    content_hash = Column("content_hash", String(64), nullable=True)
+
+    # tokens of all features joined in one document, written together with the features
+    document = Column("document", Text, nullable=True)
+
+    # last change of the labeled sample: the true rate is set or changed, or the document of a resource with a
+    # true rate is changed. Updates of the prediction do not change it
+    labeled_at = Column("labeled_at", DateTime, nullable=True)
+
     # features = relationship("Feature", cascade="save-update, merge, delete")
 
     # place index on value
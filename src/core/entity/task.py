@@ -46,6 +46,11 @@ class Task(SqlMgr.base):
 
     maxdepth = Column("maxdepth", Integer, default=1)
 
+    # max seconds and max pages of the crawl, pages beyond are skipped
+    time_budget = Column("time_budget", Integer, nullable=True)
+
+    page_budget = Column("page_budget", Integer, nullable=True)
+
     # counter of task get usage
     used = Column("used", BigInteger, nullable=False, default=0)
 
@@ -1,5 +1,4 @@
-from bs4 import BeautifulSoup
-
+from src.core.featureextractor.html_extractor import HtmlDocument
 from src.core.model.resource import Lang
 
 
@@ -29,7 +28,7 @@ class DefaultResource:
     def __init__(self):
         self.resource_features = []
 
-    def collect_features(self, content: BeautifulSoup) -> list:
+    def collect_features(self, content: HtmlDocument) -> list:
         for feature in self.get_title(content):
             self.resource_features.append(feature)
 
@@ -44,31 +43,24 @@ class DefaultResource:
 
         return self.resource_features
 
-    def get_lang_from_content(self, content: BeautifulSoup) -> str:
+    def get_lang_from_content(self, content: HtmlDocument) -> str:
         # first check head tag
         lang = None
         checked_lang = None
-        element = content.find("html")
 
-        if element and element.get("lang"):
-            lang = element.get("lang")
+        if content.html_lang:
+            lang = content.html_lang
         else:
             # continue finding language
-            elements = content.find_all("meta")
-
-            if elements:
-                for element in elements:
-                    if (
-                        element.get("property")
-                        and element.get("property") == "og:locale"
-                    ):
-                        lang = element.get("content")
-                        break
+            for meta in content.metas:
+                if meta["property"] and meta["property"] == "og:locale":
+                    lang = meta["content"]
+                    break
 
         if lang:
             if lang.find("_") != -1:
                 lang = lang.split("_")[0]
-            elif content.find("-") != -1:
+            else:
                 lang = lang.split("-")[0]
 
             if lang in self.lang_codes.keys():
@@ -77,60 +69,44 @@ class DefaultResource:
         return checked_lang if checked_lang else self.default_lang
 
     @staticmethod
-    def get_title(content: BeautifulSoup) -> list:
-        if elements := content.find_all("title"):
-            return [elements[0].get_text()]
+    def get_title(content: HtmlDocument) -> list:
+        if content.title is not None:
+            return [content.title]
         return []
 
     @staticmethod
-    def get_meta(content: BeautifulSoup) -> list:
+    def get_meta(content: HtmlDocument) -> list:
         features = []
 
         important_metas_name = ["description", "keywords"]
         important_metas_properties = ["og:description", "og:title"]
 
-        elements = content.find_all("meta")
-
-        if elements:
-            for element in elements:
-                if (
-                    element.get("name") is not None
-                    and element.get("name") in important_metas_name
-                ):
-                    content = element.get("content")
-                    if content:
-                        features.append(content)
-
-                if (
-                    element.get("property") is not None
-                    and element.get("property") in important_metas_properties
-                ):
-                    content = element.get("content")
-                    if content:
-                        features.append(content)
+        for meta in content.metas:
+            if meta["name"] is not None and meta["name"] in important_metas_name:
+                if meta["content"]:
+                    features.append(meta["content"])
+
+            if (
+                meta["property"] is not None
+                and meta["property"] in important_metas_properties
+            ):
+                if meta["content"]:
+                    features.append(meta["content"])
 
         return features
 
     @staticmethod
-    def get_headers(content: BeautifulSoup) -> list:
+    def get_headers(content: HtmlDocument) -> list:
         features = []
 
         for num in range(1, 4):
-            elements = content.find_all("h" + str(num))
-            # TODO should be checked
-            features += [element.get_text() for element in elements if element]
+            features += content.headers[num]
 
         return features
 
     @classmethod
-    def get_ahrefs(cls, content: BeautifulSoup) -> list:
-        elements = content.find_all("a")
-
-        ahrefs = [
-            element.text
-            for element in elements
-            if element.text and element.text.strip()
-        ]
+    def get_ahrefs(cls, content: HtmlDocument) -> list:
+        ahrefs = [text for text in content.anchors if text and text.strip()]
 
         if not ahrefs:
             return []
@@ -0,0 +1,125 @@
+import re
+from dataclasses import dataclass, field
+
+from lxml import etree
+
+# strings of these elements are not part of the visible text of a page
+skip_text_tags = frozenset(["script", "style", "template", "rt", "rp"])
+
+header_tags = {"h1": 1, "h2": 2, "h3": 3}
+
+link_href = re.compile("^(http|https)://.*$")
+
+
+@dataclass
+class HtmlDocument:
+    """
+    Everything the feature extractors and the crawler need from a page, collected in one pass.
+    """
+
+    # `lang` attribute of the html element
+    html_lang: str | None = None
+
+    # text of the first title element
+    title: str | None = None
+
+    # attributes `name`, `property` and `content` of all meta elements
+    metas: list = field(default_factory=list)
+
+    # texts of all h1, h2 and h3 elements pro level
+    headers: dict = field(default_factory=lambda: {1: [], 2: [], 3: []})
+
+    # texts of all anchors
+    anchors: list = field(default_factory=list)
+
+    # unique absolute http(s) links of all anchors
+    links: list = field(default_factory=list)
+
+
+def _element_text(element) -> str:
+    parts = [element.text or ""]
+    for child in element:
+        # comments and processing instructions have no string tag, only their tail is text
+        if isinstance(child.tag, str) and child.tag not in skip_text_tags:
+            parts.append(_element_text(child))
+        parts.append(child.tail or "")
+    return "".join(parts)
+
+
+def _visible_text(element) -> str:
+    for ancestor in element.iterancestors():
+        if ancestor.tag in skip_text_tags:
+            return ""
+    return _element_text(element)
+
+
+def _markup_text(value: str) -> str:
+    # libxml2 keeps markup inside <title> as raw text, html.parser parsed it: keep the text of the markup only
+    if "<" not in value:
+        return value
+
+    root = etree.fromstring(
+        f"<html><body>{value}</body></html>".encode("utf-8", errors="ignore"),
+        etree.HTMLParser(encoding="utf-8"),
+    )
+    body = root.find("body") if root is not None else None
+    return _element_text(body) if body is not None else value
+
+
+def extract_document(body: str) -> HtmlDocument:
+    """
+    Parse the page with the libxml2 html parser and collect title, metas, headers, anchor texts,
+    links and the language hint while walking the tree once.
+
+    The output equals the former BeautifulSoup (html.parser) extraction, except for malformed markup which
+    libxml2 repairs while html.parser keeps it as written:
+    - a nested <a> closes the open one, like browsers do, so the outer anchor text ends before the inner anchor
+    - a <p> closes an open <h1>, <h2> or <h3>, so the text of the paragraph is not part of the header
+    - the content of <textarea> is text, like in browsers, anchors written inside give no anchor text or link
+
+    Args:
+        body: html content of the page
+
+    Returns: collected document
+    """
+    document = HtmlDocument()
+
+    # parse bytes with an explicit encoding, unicode input with an encoding declaration is refused by lxml
+    parser = etree.HTMLParser(encoding="utf-8")
+    try:
+        root = etree.fromstring(body.encode("utf-8", errors="ignore"), parser)
+    except etree.XMLSyntaxError:
+        root = None
+
+    if root is None:
+        return document
+
+    links = {}
+    html_found = False
+    for element in root.iter("html", "title", "meta", "h1", "h2", "h3", "a"):
+        tag = element.tag
+
+        if tag == "a":
+            document.anchors.append(_visible_text(element))
+            href = element.get("href")
+            if href is not None and link_href.match(href):
+                links[href] = None
+        elif tag in header_tags:
+            document.headers[header_tags[tag]].append(_visible_text(element))
+        elif tag == "meta":
+            document.metas.append(
+                {
+                    "name": element.get("name"),
+                    "property": element.get("property"),
+                    "content": element.get("content"),
+                }
+            )
+        elif tag == "title":
+            if document.title is None:
+                document.title = _markup_text(_visible_text(element))
+        elif not html_found:
+            html_found = True
+            document.html_lang = element.get("lang")
+
+    document.links = list(links)
+    return document
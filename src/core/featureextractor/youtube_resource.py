@@ -1,13 +1,12 @@
-from bs4 import BeautifulSoup
-
 from src.core.featureextractor.default_resource import DefaultResource
+from src.core.featureextractor.html_extractor import HtmlDocument
 
 
 class YoutubeResource(DefaultResource):
     def __init__(self):
         super().__init__()
 
-    def collect_features(self, content: BeautifulSoup) -> list | None:
+    def collect_features(self, content: HtmlDocument) -> list | None:
         super().collect_features(content)
         # [self.resource_features.append(feature) for feature in self.get_video_desc(content)]
         return self.resource_features
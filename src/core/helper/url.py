@@ -1,3 +1,6 @@
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+
 def get_domain_name_from_url(url: str):
     url_parts = url.split("://")
     i = (0, 1)[len(url_parts) > 1]
@@ -5,3 +8,75 @@ def get_domain_name_from_url(url: str):
     if dm:
         dm = dm.replace("www.", "")
     return dm
+
+
+default_ports = {"http": 80, "https": 443}
+
+
+def normalize_url(url: str) -> str:
+    """
+    Normalize url to be used as a key: scheme and host are lower cased, default ports and the fragment are
+    removed. Path and query are case-sensitive and stay untouched.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+
+    try:
+        port = parts.port
+    except ValueError:
+        # invalid port, keep the given location
+        return urlunsplit((scheme, parts.netloc, parts.path, parts.query, ""))
+
+    host = parts.hostname or ""
+    if ":" in host:
+        # ipv6 address
+        host = f"[{host}]"
+
+    netloc = host
+    if port and default_ports.get(scheme) != port:
+        netloc = f"{netloc}:{port}"
+
+    if parts.username:
+        userinfo = parts.username
+        if parts.password:
+            userinfo = f"{userinfo}:{parts.password}"
+        netloc = f"{userinfo}@{netloc}"
+
+    return urlunsplit((scheme, netloc, parts.path or "/", parts.query, ""))
+
+
+def is_tracking_param(name: str, tracking_params: list) -> bool:
+    # entries ending with `*` match by prefix, e.g. `utm_*`
+    name = name.lower()
+    for param in tracking_params:
+        if param.endswith("*"):
+            if name.startswith(param[:-1]):
+                return True
+        elif name == param:
+            return True
+    return False
+
+
+def canonicalize_url(url: str, tracking_params: list | None = None) -> str:
+    """
+    Canonicalize url to recognize the same page behind different spellings: the url is normalized, the
+    trailing slash of the path is removed, tracking parameters are removed and the remaining query
+    parameters are sorted.
+
+    Args:
+        url: url to be canonicalized
+        tracking_params: names of query parameters to be removed, entries ending with `*` match by prefix
+
+    Returns: canonical url
+    """
+    parts = urlsplit(normalize_url(url))
+
+    path = parts.path
+    if len(path) > 1 and path.endswith("/"):
+        path = path.rstrip("/") or "/"
+
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    if tracking_params:
+        query = [(name, value) for name, value in query if not is_tracking_param(name, tracking_params)]
+
+    return urlunsplit((parts.scheme, parts.netloc, path, urlencode(sorted(query)), ""))
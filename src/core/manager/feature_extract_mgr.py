@@ -1,9 +1,12 @@
+import datetime
 import http
 import os
+import time
 import typing
 from pathlib import Path
 
 from fastapi import HTTPException
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
 from src.core import debug_log_entry_exit
@@ -11,10 +14,17 @@ from src.core.app_enum import ResourceStatus, ResourceType
 from src.core.entity.feature import Feature
 from src.core.entity.resource import Resource
 from src.core.featureextractor.default_resource import DefaultResource
+from src.core.featureextractor.html_extractor import HtmlDocument
 from src.core.featureextractor.youtube_resource import YoutubeResource
 from src.core.helper.url import get_domain_name_from_url
+from src.core.manager.fetch_strategy_mgr import FetchStrategyMgr
 from src.core.manager.tokenization_mgr import TokenizationMgr
 from src.core.webscrapper import parse
+from src.core.webscrapper.fetch_guard import FetchGuard
+from src.core.webscrapper.fetch_result import FetchResult
+from src.core.webscrapper.host_scheduler import HostScheduler
+from src.core.webscrapper.http_client import HttpClient
+from src.core.webscrapper.page_cache import PageCache
 from src.core.webscrapper.requests_scrapper import RequestsScrapper
 from src.core.webscrapper.webdrive_scrapper import WebDriveScrapper
 from src.utils.logger import logger
@@ -25,16 +35,37 @@ from src.utils.logger import logger
 - features can be text sentences, and tokens are 'words' which are joined after cleanup together
 """
 
-fetchers = [
-    {
-        "name": "RequestsScrapper",
-        "fetch": RequestsScrapper().fetch,
-    },
-    {
-        "name": "WebDriveScrapper",
-        "fetch": WebDriveScrapper().fetch,
-    },
-]
+
+def create_fetchers(
+    settings: dict,
+    fetch_guard: FetchGuard | None = None,
+    scheduler: HostScheduler | None = None,
+) -> list:
+    # all requests based fetches share one pooled http client and the page cache
+    http_client = HttpClient(settings)
+
+    page_cache = None
+    if settings["main"].get("fetch", {}).get("cache", {}).get("status", False):
+        page_cache = PageCache(settings)
+
+    fetchers = [
+        {
+            "name": "RequestsScrapper",
+            "scrapper": RequestsScrapper(http_client, page_cache, scheduler),
+        },
+        {
+            "name": "WebDriveScrapper",
+            "scrapper": WebDriveScrapper(settings, scheduler),
+        },
+    ]
+
+    for fetcher in fetchers:
+        fetcher["fetch"] = fetcher["scrapper"].fetch
+        if fetch_guard:
+            # skip urls and domains which failed recently
+            fetcher["fetch"] = fetch_guard.guard(fetcher["name"], fetcher["fetch"])
+
+    return fetchers
 
 
 class FeatureExtractMgr:
@@ -48,51 +79,142 @@ class FeatureExtractMgr:
         self.settings = settings
         self.token_mgr = token_mgr
 
-    @staticmethod
-    @debug_log_entry_exit(__name__)
-    def delete_features_by_resource_id(sess: Session, res_id: int) -> None:
-        sess.query(Feature).filter_by(resource_id=res_id).delete()
-        sess.flush()
+        self.fetch_guard = None
+        if settings["main"].get("fetch", {}).get("guard", {}).get("status", False):
+            self.fetch_guard = FetchGuard(settings)
+
+        # all fetchers go through one politeness scheduler
+        self.scheduler = HostScheduler(settings)
+
+        self.fetchers = create_fetchers(settings, self.fetch_guard, self.scheduler)
+
+        # learns pro domain which fetcher to try first
+        self.fetch_strategy_mgr = FetchStrategyMgr(settings)
+
+    def get_fetch_metrics(self, limit: int = 100) -> dict:
+        metrics = {
+            "fetchers": {
+                fetcher["name"]: fetcher["scrapper"].stats()
+                for fetcher in self.fetchers
+                if hasattr(fetcher["scrapper"], "stats")
+            }
+        }
+
+        metrics["politeness"] = self.scheduler.stats()
+
+        if self.fetch_guard:
+            metrics.update(self.fetch_guard.stats(limit))
+
+        return metrics
 
     @debug_log_entry_exit(__name__)
-    def extract(self, sess: Session, res: Resource) -> Resource:
-        self.delete_features_by_resource_id(sess, res.id)
+    def extract(
+        self,
+        sess: Session,
+        res: Resource,
+        fetched: tuple[FetchResult, HtmlDocument] | None = None,
+        collected: dict | None = None,
+    ) -> Resource:
+        """
+        Extract features of the resource.
 
+        Args:
+            sess: SQLAlchemy Session
+            res: resource
+            fetched: already fetched and parsed page of an url resource (e.g. by the crawler), then the first
+                fetcher is not called
+            collected: if given, the features are collected here pro resource id instead of being tokenized and
+                saved, so that the features of many resources are tokenized at once, see `save_collected_features`
+
+        Returns: resource
+        """
         # set status to 'extracting' to avoid race-conditions
         res.status = ResourceStatus.EXTRACTING
         sess.flush()
 
+        self.fetch_strategy_mgr.load()
+
         if res.type == ResourceType.TEXT:
-            self._txt_to_keywords(sess, res)
+            self._txt_to_keywords(sess, res, collected)
         elif res.type == ResourceType.URL:
-            self._url_to_keywords(sess, res)
+            self._url_to_keywords(sess, res, fetched, collected)
         elif res.type == ResourceType.FILE:
-            self._file_to_keywords(sess, res)
+            self._file_to_keywords(sess, res, collected)
         else:
             logger.error("Unknown type of resource %s", res.type)
             raise NotImplementedError
 
+        self.fetch_strategy_mgr.save()
         sess.flush()
         return res
 
+    def save_collected_features(self, sess: Session, collected: dict) -> list:
+        """
+        Tokenize the collected features of all resources at once pro language, a large corpus is tokenized
+        by the process pool of `TokenizationMgr.tokenize_many`, and save them.
+
+        Args:
+            sess: SQLAlchemy Session
+            collected: language, features and content hash pro resource id, see `extract`
+
+        Returns: resources of the saved features
+        """
+        res_ids_by_lang = {}
+        for res_id, (lang, _, _) in collected.items():
+            res_ids_by_lang.setdefault(lang, []).append(res_id)
+
+        resources = []
+        for lang, res_ids in res_ids_by_lang.items():
+            tokens = self.token_mgr.tokenize_many(
+                [feature for res_id in res_ids for feature in collected[res_id][1]], lang
+            )
+
+            start = 0
+            for res_id in res_ids:
+                end = start + len(collected[res_id][1])
+                res = sess.get(Resource, res_id)
+                if res is not None:
+                    self.save_features(sess, res, tokens[start:end])
+                    res.content_hash = collected[res_id][2]
+                    resources.append(res)
+                start = end
+
+        return resources
+
+    def _tokenize_and_save_features(
+        self,
+        sess: Session,
+        res: Resource,
+        features: list,
+        collected: dict | None,
+        content_hash: str | None = None,
+    ) -> None:
+        # the content hash is only written together with the features of the content, otherwise a failed save
+        # would keep stale features of content taken as unchanged
+        if collected is not None:
+            collected[res.id] = (res.lang, features, content_hash)
+            return
+
+        self.save_features(sess, res, self.token_mgr.tokenize_many(features, res.lang))
+        res.content_hash = content_hash
+
     @debug_log_entry_exit(__name__)
-    def _txt_to_keywords(self, sess: Session, res: Resource) -> None:
-        if tokenized := self.token_mgr.tokenize(res.value, res.lang):
-            self.add_feature(sess, res, tokenized)
+    def _txt_to_keywords(self, sess: Session, res: Resource, collected: dict | None = None) -> None:
+        self._tokenize_and_save_features(sess, res, [res.value], collected)
 
         self._set_resource_status(res, ResourceStatus.EXTRACTED)
 
     @debug_log_entry_exit(__name__)
-    def _file_to_keywords(self, sess, res: Resource) -> None:
+    def _file_to_keywords(self, sess, res: Resource, collected: dict | None = None) -> None:
         file = os.sep.join([self.data_path_dir, res.value])
         file_path = Path(file)
 
         if file_path.is_file():
             with open(file, "r") as f:
-                if tokenized := self.token_mgr.tokenize(f.read(), res.lang):
-                    self.add_feature(sess, res, tokenized)
+                self._tokenize_and_save_features(sess, res, [f.read()], collected)
             self._set_resource_status(res, ResourceStatus.EXTRACTED)
         else:
+            self.save_features(sess, res, [])
             self._set_resource_status(
                 res,
                 ResourceStatus.DECLINED,
@@ -101,18 +223,59 @@ class FeatureExtractMgr:
             )
 
     @debug_log_entry_exit(__name__)
-    def _url_to_keywords(self, sess: Session, res: Resource) -> None:
+    def _url_to_keywords(
+        self,
+        sess: Session,
+        res: Resource,
+        fetched: tuple[FetchResult, HtmlDocument] | None = None,
+        collected: dict | None = None,
+    ) -> None:
         res_features = None
-        for fetcher in fetchers:
-            res_features = self.get_features(res, fetcher["fetch"])
-            if res.status == ResourceStatus.DECLINED:
+        content_hash = None
+        for fetcher in self.fetch_strategy_mgr.order(res.value, self.fetchers):
+            # outcomes are recorded only for own fetches, given content is recorded by its fetcher
+            started = None
+            if fetched is None:
+                started = time.perf_counter()
+                fetched = self.fetch_content(res, fetcher["fetch"])
+                if res.status == ResourceStatus.DECLINED:
+                    self.fetch_strategy_mgr.record(
+                        res.value, fetcher["name"], False, time.perf_counter() - started
+                    )
+                    self.save_features(sess, res, [])
+                    return
+
+            result, content = fetched
+            fetched = None
+
+            if self._is_content_unchanged(res, result):
+                # the page is the same as while the last extraction, the stored features are still valid
+                logger.info("content is unchanged, keep features of resource: %s", res.value)
+                if started is not None:
+                    self.fetch_strategy_mgr.record(
+                        res.value, fetcher["name"], True, time.perf_counter() - started
+                    )
+                self._set_resource_status(res, ResourceStatus.EXTRACTED)
                 return
 
+            res_features = self.get_features(res, content)
+            if started is not None:
+                self.fetch_strategy_mgr.record(
+                    res.value,
+                    fetcher["name"],
+                    bool(res_features),
+                    time.perf_counter() - started,
+                    len(res_features),
+                )
+
             if res_features:
+                content_hash = result.content_hash
                 logger.info("features are extracted by %s", fetcher["name"])
                 break
 
         if res_features is None or len(res_features) == 0:
+            self.save_features(sess, res, [])
+            res.content_hash = None
             self._set_resource_status(
                 res,
                 ResourceStatus.DECLINED,
@@ -121,9 +284,7 @@ class FeatureExtractMgr:
             )
             return
 
-        for feature in res_features:
-            if tokenized := self.token_mgr.tokenize(feature, res.lang):
-                self.add_feature(sess, res, tokenized)
+        self._tokenize_and_save_features(sess, res, res_features, collected, content_hash)
 
         self._set_resource_status(res, ResourceStatus.EXTRACTED)
 
@@ -138,10 +299,12 @@ class FeatureExtractMgr:
         res.status_reason_code = code
         res.status_reason_msg = msg
 
-    def get_features(self, res: Resource, fetch: typing.Callable) -> list | None:
+    def fetch_content(
+        self, res: Resource, fetch: typing.Callable
+    ) -> tuple[FetchResult, HtmlDocument] | None:
         try:
             logger.info("start parsing resource: %s", res.value)
-            content = parse(res.value, fetch)
+            fetched = parse(res.value, fetch)
             logger.info("end parsing resource: %s", res.value)
         except HTTPException as e:
             self._set_resource_status(
@@ -150,6 +313,17 @@ class FeatureExtractMgr:
             logger.info("end parsing resource: %s with an error %s", res.value, str(e))
             return None
 
+        return fetched
+
+    @staticmethod
+    def _is_content_unchanged(res: Resource, result: FetchResult) -> bool:
+        return (
+            res.content_hash is not None
+            and res.content_hash == result.content_hash
+            and (res.document is not None or bool(res.features))
+        )
+
+    def get_features(self, res: Resource, content: HtmlDocument) -> list:
         feature_extractor = self.get_feature_extractor(res.value)
 
         if res.lang is None:
@@ -164,9 +338,51 @@ class FeatureExtractMgr:
 
     @staticmethod
     @debug_log_entry_exit(__name__)
-    def add_feature(sess: Session, res: Resource, token: str) -> None:
-        feature = Feature(resource_id=res.id, token=token)
-        sess.add(feature)
+    def save_features(sess: Session, res: Resource, tokens: list) -> None:
+        """
+        Replace the features of the resource by the tokens, empty tokens are skipped, and store the tokens
+        joined as the document of the resource.
+
+        Stored features are kept as they are if they have the same tokens in the same order, otherwise they
+        are deleted and the tokens are inserted with one batched insert, a resource with a true rate gets a new
+        label time then.
+
+        Args:
+            sess: SQLAlchemy Session
+            res: resource of the features
+            tokens: tokenized features
+
+        Returns: None
+        """
+        tokens = [token for token in tokens if token]
+
+        # same document as Classifier.get_feature_tokens gives for the features
+        res.document = " ".join(tokens) or None
+
+        stored_tokens = [
+            token
+            for token, in sess.query(Feature.token)
+            .filter_by(resource_id=res.id)
+            .order_by(Feature.id)
+        ]
+        if stored_tokens == tokens:
+            logger.info("tokens are unchanged, keep features of resource: %s", res.value)
+            return
+
+        # a labeled resource with another document is a new training sample
+        if res.true_rate is not None and res.true_rate >= 0:
+            res.labeled_at = datetime.datetime.now()
+
+        sess.query(Feature).filter_by(resource_id=res.id).delete()
+        if tokens:
+            sess.execute(
+                insert(Feature),
+                [{"resource_id": res.id, "token": token} for token in tokens],
+            )
+        sess.flush()
+
+        # features are written past the orm, load them again on the next access
+        sess.expire(res, ["features"])
 
     @staticmethod
     @debug_log_entry_exit(__name__)
@@ -0,0 +1,263 @@
+import datetime
+import random
+import threading
+import time
+from dataclasses import dataclass
+
+from sqlalchemy.dialects.postgresql import insert
+
+from src.core.entity.fetcher_stat import FetcherStat
+from src.core.helper.url import get_domain_name_from_url
+from src.core.manager.sql_mgr import SqlMgr
+from src.utils.logger import logger
+
+
+@dataclass
+class FetchOutcomes:
+    attempts: int = 0
+    successes: int = 0
+    features_total: int = 0
+    features_samples: int = 0
+    latency_total: float = 0.0
+
+    def add(self, outcomes: "FetchOutcomes") -> None:
+        self.attempts += outcomes.attempts
+        self.successes += outcomes.successes
+        self.features_total += outcomes.features_total
+        self.features_samples += outcomes.features_samples
+        self.latency_total += outcomes.latency_total
+
+    @property
+    def success_rate(self) -> float:
+        # laplace smoothing, an unknown fetcher counts as 50% successful
+        return (self.successes + 1) / (self.attempts + 2)
+
+    @property
+    def features_avg(self) -> float:
+        return self.features_total / self.features_samples if self.features_samples else 0.0
+
+    @property
+    def latency_avg(self) -> float:
+        return self.latency_total / self.attempts if self.attempts else 0.0
+
+
+class FetchStrategyMgr:
+    """
+    Learns pro domain which fetcher is most likely to fetch a page with features.
+
+    Outcomes of the fetches (success, amount of extracted features, latency) are counted pro domain and
+    fetcher in memory and added to the table `fetcherstats` on save, so that all processes share them. The
+    outcomes of all processes are loaded again every `reload_interval` seconds.
+    Fetchers are ordered by success rate, then by feature yield and then by latency. Success rates and
+    yields in the same tenth are taken as equal, fetchers without a difference keep the configured order.
+    With the probability `explore_rate` the configured order is used, so that a fetcher losing on a domain
+    is tried again from time to time.
+    """
+
+    explore_rate_default = 0.1
+    min_attempts_default = 3
+    reload_interval_default = 300
+
+    def __init__(self, settings: dict):
+        self.settings = settings
+
+        strategy_settings = settings["main"].get("fetch", {}).get("strategy", {})
+        self.status = strategy_settings.get("status", True)
+        self.explore_rate = strategy_settings.get(
+            "explore_rate", self.explore_rate_default
+        )
+        self.min_attempts = strategy_settings.get(
+            "min_attempts", self.min_attempts_default
+        )
+        self.reload_interval = strategy_settings.get(
+            "reload_interval", self.reload_interval_default
+        )
+
+        self.lock = threading.Lock()
+
+        # monotonic time of the last load, None if the outcomes are not loaded yet
+        self.loaded_at = None
+
+        # all known outcomes and outcomes not saved yet pro (domain, fetcher)
+        self.outcomes = {}
+        self.pending = {}
+
+    def load(self) -> None:
+        """
+        Load the outcomes of all domains saved by all processes, again after `reload_interval` seconds, calls
+        in between are ignored.
+
+        The outcomes are read in an own session. If they cannot be read, the known outcomes are kept and the
+        next call tries again.
+
+        Returns: None
+        """
+        if not self.status:
+            return
+
+        now = time.monotonic()
+        if self.loaded_at is not None and now - self.loaded_at < self.reload_interval:
+            return
+
+        sess = SqlMgr.create_session()
+        try:
+            outcomes = {}
+            for row in sess.query(FetcherStat).all():
+                outcomes[(row.domain, row.fetcher)] = FetchOutcomes(
+                    attempts=row.attempts,
+                    successes=row.successes,
+                    features_total=row.features_total,
+                    features_samples=row.features_samples,
+                    latency_total=row.latency_total,
+                )
+        except Exception as e:
+            logger.error("fetcher outcomes cannot be loaded: %s", str(e)[0:255])
+            return
+        finally:
+            sess.close()
+
+        with self.lock:
+            # saved outcomes are part of the rows, outcomes not saved yet are pending, count them as well
+            for key, pending in self.pending.items():
+                outcomes.setdefault(key, FetchOutcomes()).add(pending)
+            self.outcomes = outcomes
+            self.loaded_at = now
+
+    def save(self) -> None:
+        """
+        Add pending outcomes to the table `fetcherstats`.
+
+        The outcomes are saved in an own short transaction, so the rows of the table are not locked while
+        a resource is extracted and the outcomes are kept if the transaction of the resource is rolled back.
+        If the save fails, the outcomes stay pending for the next save.
+
+        Returns: None
+        """
+        with self.lock:
+            pending = self.pending
+            self.pending = {}
+
+        if not pending:
+            return
+
+        sess = SqlMgr.create_session()
+        try:
+            # rows are locked in the same order by all processes
+            for (domain, fetcher), outcomes in sorted(pending.items()):
+                stmt = insert(FetcherStat).values(
+                    domain=domain,
+                    fetcher=fetcher,
+                    attempts=outcomes.attempts,
+                    successes=outcomes.successes,
+                    features_total=outcomes.features_total,
+                    features_samples=outcomes.features_samples,
+                    latency_total=outcomes.latency_total,
+                )
+                # add up in the database, other processes save their outcomes for the same rows
+                sess.execute(
+                    stmt.on_conflict_do_update(
+                        constraint="uq_fetcherstats_domain_fetcher",
+                        set_={
+                            "attempts": FetcherStat.attempts + stmt.excluded.attempts,
+                            "successes": FetcherStat.successes + stmt.excluded.successes,
+                            "features_total": FetcherStat.features_total
+                            + stmt.excluded.features_total,
+                            "features_samples": FetcherStat.features_samples
+                            + stmt.excluded.features_samples,
+                            "latency_total": FetcherStat.latency_total
+                            + stmt.excluded.latency_total,
+                            "last_modified": datetime.datetime.now(),
+                        },
+                    )
+                )
+            sess.commit()
+        except Exception as e:
+            logger.error("fetcher outcomes cannot be saved: %s", str(e)[0:255])
+            sess.rollback()
+
+            with self.lock:
+                for key, outcomes in pending.items():
+                    self.pending.setdefault(key, FetchOutcomes()).add(outcomes)
+        finally:
+            sess.close()
+
+    def record(
+        self,
+        url: str,
+        fetcher: str,
+        success: bool,
+        latency: float,
+        features_qty: int | None = None,
+    ) -> None:
+        """
+        Count the outcome of a fetch.
+
+        Args:
+            url: fetched url
+            fetcher: name of the fetcher
+            success: the page is fetched (and features are extracted, if they were extracted)
+            latency: seconds the fetch took
+            features_qty: amount of extracted features, None if features were not extracted
+
+        Returns: None
+        """
+        if not self.status:
+            return
+
+        outcome = FetchOutcomes(
+            attempts=1,
+            successes=int(success),
+            features_total=features_qty or 0,
+            features_samples=int(features_qty is not None),
+            latency_total=latency,
+        )
+        key = (get_domain_name_from_url(url), fetcher)
+
+        with self.lock:
+            self.outcomes.setdefault(key, FetchOutcomes()).add(outcome)
+            self.pending.setdefault(key, FetchOutcomes()).add(outcome)
+
+    def order(self, url: str, fetchers: list) -> list:
+        """
+        Order the fetchers for the url, the fetcher most likely to succeed first.
+
+        Args:
+            url: url to be fetched
+            fetchers: fetchers in the configured order
+
+        Returns: ordered fetchers
+        """
+        if not self.status or len(fetchers) < 2 or random.random() < self.explore_rate:
+            return fetchers
+
+        domain = get_domain_name_from_url(url)
+        with self.lock:
+            outcomes = {
+                fetcher["name"]: self.outcomes.get((domain, fetcher["name"]))
+                for fetcher in fetchers
+            }
+
+        known = [
+            outcome
+            for outcome in outcomes.values()
+            if outcome and outcome.attempts >= self.min_attempts
+        ]
+        if not known:
+            return fetchers
+
+        features_max = max(outcome.features_avg for outcome in known) or 1.0
+
+        def score(fetcher: dict) -> tuple:
+            outcome = outcomes[fetcher["name"]]
+            if outcome is None or outcome.attempts < self.min_attempts:
+                outcome = FetchOutcomes()
+            return (
+                -round(outcome.success_rate, 1),
+                -round(outcome.features_avg / features_max, 1),
+                outcome.latency_avg,
+            )
+
+        ordered = sorted(fetchers, key=score)
+        if ordered[0] is not fetchers[0]:
+            logger.info("fetch %s with %s first", url, ordered[0]["name"])
+        return ordered
@@ -1,25 +1,39 @@
+import datetime
+import glob
 import http
 import json
 import os
+import posixpath
+import re
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
 from pathlib import Path
 from typing import Any, Type
 
-from sqlalchemy import or_
+from sqlalchemy import func, literal, or_, update
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 from sqlalchemy.orm import Query
 from sqlalchemy.orm.session import Session
 
 from src.core import debug_log_entry_exit
 from src.core.app_enum import ResourceStatus, ResourceType
 from src.core.app_error import AppError
+from src.core.entity.feature import Feature
 from src.core.entity.resource import Resource
 from src.core.helper import url
 from src.core.manager.domain_query_mgr import DomainQueryMgr
 from src.core.manager.feature_extract_mgr import FeatureExtractMgr
+from src.core.manager.sql_mgr import SqlMgr
 from src.core.model.resource import Lang
 from src.utils.logger import logger
 
 
 class ResourceMgr:
+    # training data files of the resources (relative to src)
+    data_dir = "data"
+
+    analyse_workers_default = 8
+
     def __init__(
         self,
         settings: dict,
@@ -31,6 +45,10 @@ class ResourceMgr:
         self.domainquery_mgr = domainquery_mgr
         self.classifier = None
 
+        self.analyse_workers = (
+            settings["main"].get("analyse", {}).get("workers", self.analyse_workers_default)
+        )
+
     @staticmethod
     def is_declined(resource) -> bool:
         return resource.status in [ResourceStatus.DECLINED]
@@ -95,6 +113,77 @@ class ResourceMgr:
             .filter(Resource.true_rate >= 0)
         )
 
+    @staticmethod
+    def get_checked_with_truerate_documents(
+        sess: Session,
+        labeled_after: datetime.datetime | None = None,
+        labeled_until: datetime.datetime | None = None,
+    ) -> list:
+        """
+        Read documents and true rates of the checked resources with a true rate and a document.
+
+        Args:
+            sess: SQLAlchemy Session
+            labeled_after: only resources labeled after this time
+            labeled_until: only resources labeled until this time (inclusive)
+
+        Returns: rows of (document, true_rate)
+        """
+        query = (
+            sess.query(Resource.document, Resource.true_rate)
+            .filter(Resource.status == ResourceStatus.CHECKED)
+            .filter(Resource.true_rate >= 0)
+            .filter(Resource.document.is_not(None))
+        )
+        if labeled_after is not None:
+            query = query.filter(Resource.labeled_at > labeled_after)
+        if labeled_until is not None:
+            query = query.filter(Resource.labeled_at <= labeled_until)
+
+        return query.order_by(Resource.id).all()
+
+    @staticmethod
+    def get_truerate_watermark(sess: Session) -> datetime.datetime | None:
+        """
+        Returns: latest label time of the checked resources with a true rate
+        """
+        return (
+            sess.query(func.max(Resource.labeled_at))
+            .filter(Resource.status == ResourceStatus.CHECKED)
+            .filter(Resource.true_rate >= 0)
+            .scalar()
+        )
+
+    @staticmethod
+    def fill_missing_documents(sess: Session) -> int:
+        """
+        Write the documents of resources which have features but no document yet (extracted before documents
+        were stored or restored from records), the tokens are joined in the database.
+
+        Args:
+            sess: SQLAlchemy Session
+
+        Returns: amount of filled documents
+        """
+        documents = (
+            sess.query(
+                Feature.resource_id,
+                func.string_agg(Feature.token, aggregate_order_by(literal(" "), Feature.id)),
+            )
+            .join(Resource, Resource.id == Feature.resource_id)
+            .filter(Resource.document.is_(None))
+            .filter(Feature.token.is_not(None), Feature.token != "")
+            .group_by(Feature.resource_id)
+            .all()
+        )
+        if documents:
+            sess.execute(
+                update(Resource),
+                [{"id": res_id, "document": document} for res_id, document in documents],
+            )
+        logger.info("Filled documents of %s resources", len(documents))
+        return len(documents)
+
     @staticmethod
     def get_checked_with_predictionrate_resources(
         sess: Session,
@@ -274,26 +363,132 @@ class ResourceMgr:
 
     @debug_log_entry_exit(__name__)
     def analyse_resources(self, sess: Session) -> None:
-        resources = self.get_resources_by_status(sess, ResourceStatus.CHECK)
-        # TODO maybe take outside???
-        find_cmd = "find ./src/data -name '*.txt' -type f"
-
-        for res in resources:
-            try:
-                res = self.feature_extract_mgr.extract(sess, res)
-                if ResourceStatus.DECLINED == res.status:
-                    val = res.value.replace("/", "\\/")
-                    sed = f"sed -i -e '/{val}/Id'"
-                    cmd = f"{find_cmd} | xargs {sed}"
-                    os.system(cmd)
-                    sess.delete(res)
-                else:
-                    res.status = ResourceStatus.CHECKED
+        """
+        Extract features of all resources to be checked with `analyse_workers` threads, every resource in
+        an own session. The features of all resources are tokenized at once at the end (a large corpus by
+        a process pool), the resources stay to be checked until their features are saved. Declined resources
+        are deleted and their values are removed from the data files at the end, all at once.
+
+        Args:
+            sess: SQLAlchemy Session
+
+        Returns: None
+        """
+        resource_ids = [
+            res_id
+            for res_id, in sess.query(Resource.id)
+            .filter_by(status=ResourceStatus.CHECK)
+            .order_by(Resource.id)
+        ]
+        logger.info(
+            "Analyse %s resources with %s workers", len(resource_ids), self.analyse_workers
+        )
 
-                sess.commit()
-            except Exception as e:
-                logger.error("error occurred while analysing resources: {}", str(e))
-                sess.rollback()
+        # language and features pro resource id, every worker adds its own resources
+        collected = {}
+        with ThreadPoolExecutor(max_workers=self.analyse_workers) as executor:
+            declined_values = [
+                value
+                for value in executor.map(
+                    self._analyse_resource, resource_ids, repeat(collected)
+                )
+                if value is not None
+            ]
+
+        self._save_analysed_features(collected)
+        self.remove_values_from_data_files(declined_values)
+
+    def _analyse_resource(self, res_id: int, collected: dict) -> str | None:
+        """
+        Extract features of the resource in an own session, the features are collected to be saved later.
+
+        Returns: value of the resource if it is declined and deleted, otherwise None
+        """
+        sess = SqlMgr.create_session()
+        try:
+            res = self.get_resource_by_id(sess, res_id)
+            if res is None or res.status != ResourceStatus.CHECK:
+                return None
+
+            declined_value = None
+            res = self.feature_extract_mgr.extract(sess, res, collected=collected)
+            if ResourceStatus.DECLINED == res.status:
+                declined_value = res.value
+                sess.delete(res)
+            elif res.id in collected:
+                # checked once the features are saved, a failed run analyses the resource again
+                res.status = ResourceStatus.CHECK
+            else:
+                res.status = ResourceStatus.CHECKED
+
+            sess.commit()
+            return declined_value
+        except Exception as e:
+            logger.error("error occurred while analysing resources: %s", str(e))
+            sess.rollback()
+            collected.pop(res_id, None)
+            return None
+        finally:
+            sess.close()
+
+    def _save_analysed_features(self, collected: dict) -> None:
+        if not collected:
+            return
+
+        logger.info("Tokenize and save features of %s resources", len(collected))
+        sess = SqlMgr.create_session()
+        try:
+            for res in self.feature_extract_mgr.save_collected_features(sess, collected):
+                res.status = ResourceStatus.CHECKED
+            sess.commit()
+        except Exception as e:
+            logger.error("error occurred while saving features of analysed resources: %s", str(e))
+            sess.rollback()
+        finally:
+            sess.close()
+
+    @classmethod
+    def remove_values_from_data_files(cls, values: list) -> None:
+        """
+        Remove the lines containing any of the values (case-insensitive) from all data files, every file is
+        rewritten at most once.
+
+        Args:
+            values: values of declined resources
+
+        Returns: None
+        """
+        values = {value for value in values if value}
+        if not values:
+            return
+
+        # one pattern for all values, every line is searched once
+        pattern = re.compile(
+            "|".join(re.escape(value) for value in sorted(values)), re.IGNORECASE
+        )
+
+        data_dir = posixpath.normpath(
+            os.path.join(os.path.dirname(__file__), "../..", cls.data_dir)
+        )
+        for file in sorted(glob.glob(os.path.join(data_dir, "*.txt"))):
+            with open(file, "r", encoding="utf-8") as f:
+                lines = f.readlines()
+
+            kept_lines = [line for line in lines if not pattern.search(line)]
+            if len(kept_lines) == len(lines):
+                continue
+
+            # replace the file at once, an interrupted rewrite does not leave a partial file
+            tmp_file = f"{file}.tmp"
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                f.writelines(kept_lines)
+            os.replace(tmp_file, file)
+
+            logger.info(
+                "Removed %s lines of declined resources from %s",
+                len(lines) - len(kept_lines),
+                file,
+            )
 
     @debug_log_entry_exit(__name__)
     def predict_resource(
@@ -305,13 +500,39 @@ class ResourceMgr:
         if resource.id is None:
             raise ValueError("The resource is not set")
 
-        resource.status = ResourceStatus.PREDICTING
+        return self.predict_resources(sess, [resource], show_top_features)[0]
+
+    @debug_log_entry_exit(__name__)
+    def predict_resources(
+        self, sess: Session, resources: list, show_top_features: bool = False
+    ) -> list:
+        """
+        Predict the resources with batched classifier calls.
+
+        Args:
+            sess: SQLAlchemy Session
+            resources: resources with extracted features
+            show_top_features: set top features of the resources
+
+        Returns: predicted resources
+        """
+        if self.classifier is None:
+            raise ValueError("The classifier is not set")
+
+        for resource in resources:
+            resource.status = ResourceStatus.PREDICTING
         sess.flush()
 
-        prediction_result, top_features = self.classifier.predict_resource(
-            resource, show_top_features
-        )
+        predictions = self.classifier.predict_resources(resources, show_top_features)
+        for resource, (prediction_result, top_features) in zip(resources, predictions):
+            self._set_prediction(resource, prediction_result, top_features)
+
+        sess.flush()
 
+        return resources
+
+    @staticmethod
+    def _set_prediction(resource: Resource, prediction_result, top_features) -> None:
         if prediction_result is None:
             resource.prediction_rate = None
             resource.top_features = None
@@ -327,10 +548,6 @@ class ResourceMgr:
             resource.status_reason_code = ""
             resource.status_reason_msg = ""
 
-        sess.flush()
-
-        return resource
-
     @debug_log_entry_exit(__name__)
     def read_resources_from_file(
         self, sess: Session, file_path: str, update_resource: bool = False
@@ -372,6 +589,8 @@ class ResourceMgr:
 
                 if update_resource:
                     if resource := self.get_resource_by_value(sess, res_value):
+                        if resource.true_rate != res_pred:
+                            resource.labeled_at = datetime.datetime.now()
                         resource.type = res_type
                         resource.lang = res_lang
                         resource.is_propog = res_is_propog
@@ -389,6 +608,7 @@ class ResourceMgr:
                         is_propog=res_is_propog,
                         true_rate=res_pred,
                         prediction_rate=res_pred,
+                        labeled_at=datetime.datetime.now(),
                     )
                     self.add_or_get_exist_resource(sess, resource)
                 sess.flush()
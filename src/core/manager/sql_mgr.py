@@ -27,6 +27,7 @@ class SqlMgr:
         "resources",
         "domainqueries",
         "tasks",
+        "fetcherstats",
     ]
 
     @classmethod
@@ -13,6 +13,7 @@ from sqlalchemy.orm import Query, Session
 from src.core.api.responser import Responser
 from src.core.app_enum import (
     PredictionRate,
+    ResourceStatus,
     ResourceType,
     TaskNotificationResponse,
     TaskStatus,
@@ -21,13 +22,14 @@ from src.core.entity.page_item import PageItem
 from src.core.entity.resource import Resource
 from src.core.entity.task import Task
 from src.core.helper.rate import prediction_to_violation
-from src.core.manager.feature_extract_mgr import fetchers
-from src.core.webscrapper import get_content_by_val_and_collect_links
+from src.core.webscrapper.crawler import Crawler
 from src.utils.logger import logger
 
 
 class TaskMgr:
     delete_in_days_default = 30
+    time_budget_default = 300
+    page_budget_default = 500
 
     def __init__(self, settings, resource_mgr):
         self.settings = settings
@@ -35,6 +37,27 @@ class TaskMgr:
         self.task_notification_tries = settings["main"]["task"][
             "task_notification_tries"
         ]
+        crawler_settings = settings["main"]["task"].get("crawler", {})
+        self.time_budget = crawler_settings.get("time_budget", self.time_budget_default)
+        self.page_budget = crawler_settings.get("max_pages", self.page_budget_default)
+
+        self.crawler = Crawler(
+            settings,
+            resource_mgr.feature_extract_mgr.fetchers,
+            resource_mgr.feature_extract_mgr.fetch_strategy_mgr,
+        )
+
+    def get_time_budget(self, time_budget: int | None = None) -> int:
+        # the requested budget cannot exceed the configured one
+        if time_budget and self.time_budget:
+            return min(time_budget, self.time_budget)
+        return time_budget or self.time_budget
+
+    def get_page_budget(self, page_budget: int | None = None) -> int:
+        # the requested budget cannot exceed the configured one
+        if page_budget and self.page_budget:
+            return min(page_budget, self.page_budget)
+        return page_budget or self.page_budget
 
     @staticmethod
     def get_task_by_uuid(sess: Session, uuid: UUID) -> Task | None:
@@ -148,8 +171,8 @@ class TaskMgr:
 
     def run_check_tasks(self, sess: Session):
         """
-        Get `check` tasks, collects links, creates json_data from page_items and saves
-            it to 'task.data' for future needs.
+        Get `check` tasks, collects links, extracts features of the fetched pages, creates json_data from
+            page_items and saves it to 'task.data' for future needs.
 
         Args:
             sess: SQLAlchemy Session
@@ -158,9 +181,14 @@ class TaskMgr:
         """
         tasks = self.get_tasks_by_status(sess, TaskStatus.CHECK)
 
+        fetch_strategy_mgr = self.resource_mgr.feature_extract_mgr.fetch_strategy_mgr
+
         for task in tasks:
             try:
                 if task.status == TaskStatus.CHECK:
+                    # outcomes saved by other processes meanwhile are taken into account
+                    fetch_strategy_mgr.load()
+
                     # change to 'extracting' task before continue
                     task.status = TaskStatus.EXTRACTING
                     sess.flush()
@@ -169,12 +197,13 @@ class TaskMgr:
                     root_page_item = PageItem(link=task.value)
 
                     # collect links pro depth and get page content.
-                    # Start from 0. Even if max_depth is 0, content will be taken
-                    self._run_check_task(0, task.maxdepth, [root_page_item])
+                    # Even if max_depth is 0, content will be taken
+                    fetched_pages = self._run_check_task(root_page_item, task)
+                    fetch_strategy_mgr.save()
 
                     # extract resources and attach them to task
                     self._create_resources_and_attach_to_task(
-                        sess, root_page_item, task
+                        sess, root_page_item, task, fetched_pages
                     )
 
                     task.status = TaskStatus.EXTRACTED
@@ -215,7 +244,7 @@ class TaskMgr:
                     page_item = PageItem(json_data=json_unzipped)
 
                     # predict resource and set rate to page_item
-                    self._predict_resources(sess, page_item, task)
+                    self._predict_task_resources(sess, page_item, task)
 
                     task.status = TaskStatus.CHECKED
                     task.status_reason_msg = ""
@@ -282,44 +311,46 @@ class TaskMgr:
     def jdefault(o):
         return o.__dict__
 
-    def _run_check_task(self, current_depth, max_depth, pages):
-        # go through all links and get another links
-        next_pages = []
-
-        for page_item in pages:
-            local_links = None
-            for fetcher in fetchers:
-                local_links = get_content_by_val_and_collect_links(
-                    fetcher["fetch"], page_item.link, max_depth > 0
-                )
-                if local_links is not None:
-                    break
-
-            if local_links is None:
-                logger.warn(
-                    "cannot collect any link, something wrong went here: {}",
-                    page_item.link,
-                )
-
-            if len(local_links) > 0:
-                # creates new page-items from getting links
-                page_item.create_pages_by_links(local_links)
-                next_pages.extend(page_item.pages)
+    def _run_check_task(self, root_page_item: PageItem, task: Task) -> dict:
+        # go through all links pro depth concurrently and get another links, within the budgets of the task.
+        # Tasks created before the budgets were introduced get the configured ones
+        return self.crawler.crawl(
+            root_page_item,
+            task.maxdepth,
+            time_budget=self.get_time_budget(task.time_budget),
+            page_budget=self.get_page_budget(task.page_budget),
+        )
 
-        if (current_depth + 1) < max_depth:
-            self._run_check_task(current_depth + 1, max_depth, next_pages)
+    @staticmethod
+    def _needs_extraction(resource: Resource, task: Task) -> bool:
+        if resource.status in [ResourceStatus.CHECK, ResourceStatus.DECLINED]:
+            return True
+
+        # already predicted resources are extracted again only if the task asks for a re-check
+        return bool(task.recheck) and resource.status in [
+            ResourceStatus.CHECKED,
+            ResourceStatus.EXTRACTED,
+        ]
 
-    def _create_resources_and_attach_to_task(self, sess: Session, page_item: PageItem, task: Task):
+    def _create_resources_and_attach_to_task(
+        self, sess: Session, page_item: PageItem, task: Task, fetched_pages: dict
+    ):
         """
-        Create resources if needed and attach resource_id to page_item
+        Create resources if needed, extract their features from the crawled pages and attach resource_id
+        to page_item
 
         Args:
             sess: current session
             page_item: page object
             task: current task
+            fetched_pages: fetch result and parsed content pro canonical link of the crawled pages
 
         Returns: None
         """
+        if page_item.skipped:
+            # the page is not fetched within the budget of the task, it gets no resource
+            return
+
         resource = Resource(
             value=page_item.link,
             type=ResourceType.URL,
@@ -331,6 +362,12 @@ class TaskMgr:
         # create a new resource if the resource does not exist, otherwise use already created
         resource = self.resource_mgr.add_or_get_exist_resource(sess, resource)
 
+        # the page is already fetched by the crawler, extract features now instead of fetching it
+        # again while the prediction
+        fetched = fetched_pages.get(self.crawler.canonicalize(page_item.link))
+        if fetched and self._needs_extraction(resource, task):
+            self.resource_mgr.feature_extract_mgr.extract(sess, resource, fetched)
+
         # set resource-id for future needs
         page_item.resource_id = resource.id
 
@@ -339,28 +376,72 @@ class TaskMgr:
 
         # next subpage
         for page_item_new in page_item.pages:
-            self._create_resources_and_attach_to_task(sess, page_item_new, task)
+            self._create_resources_and_attach_to_task(
+                sess, page_item_new, task, fetched_pages
+            )
+
+    def _predict_task_resources(self, sess, root_page_item: PageItem, task: Task):
+        """
+        Predict task resources and link, resources extracted while the check of the task are predicted
+        together in batches
+
+        Args:
+            sess: SQLAlchemy Session
+            root_page_item: Page Item
+            task: Task
+
+        Returns: None
+
+        Raises:
+            ValueError
+        """
+        # resource id -> (resource, page items of the resource)
+        extracted = {}
+        self._predict_resources(sess, root_page_item, task, extracted)
+
+        if not extracted:
+            return
 
-    def _predict_resources(self, sess, page_item: PageItem, task: Task):
+        self.resource_mgr.predict_resources(
+            sess,
+            [resource for resource, _ in extracted.values()],
+            show_top_features=bool(task.recheck),
+        )
+
+        for resource, page_items in extracted.values():
+            for page_item in page_items:
+                page_item.top_features = resource.top_features
+                page_item.rate = prediction_to_violation(resource.prediction_rate)
+
+    def _predict_resources(
+        self, sess, page_item: PageItem, task: Task, extracted: dict
+    ):
         """
-        Predict task resources and link
+        Predict task resources and link, extracted resources are collected to be predicted in batches
 
         Args:
             sess: SQLAlchemy Session
             page_item: Page Item
             task: Task
+            extracted: collects extracted resources and their page items
 
         Returns: None
 
         Raises:
             ValueError
         """
+        if page_item.skipped:
+            return
+
         resource_id = page_item.resource_id
 
         if resource_id:
             requested_resource = self.resource_mgr.get_resource_by_id(sess, resource_id)
 
-            if requested_resource:
+            if requested_resource and requested_resource.status == ResourceStatus.EXTRACTED:
+                # features are extracted while the check of the task, predict together with the others
+                extracted.setdefault(requested_resource.id, (requested_resource, []))[1].append(page_item)
+            elif requested_resource:
                 try:
                     if task.recheck:
                         # if re-check, then re-predict the resource
@@ -398,7 +479,7 @@ class TaskMgr:
 
         # next subpage
         for page_item_new in page_item.pages:
-            self._predict_resources(sess, page_item_new, task)
+            self._predict_resources(sess, page_item_new, task, extracted)
 
     def _collect_resources_rates(
         self,
@@ -424,7 +505,7 @@ class TaskMgr:
         Raises:
             ValueError
         """
-        if latest_resource_rate:
+        if latest_resource_rate and not page_item.skipped:
             resource_id = page_item.resource_id
 
             if resource_id:
@@ -446,7 +527,9 @@ class TaskMgr:
                     )
                 )
 
-        stats[page_item.rate] = stats[page_item.rate] + 1
+        # skipped pages have no rate
+        if not page_item.skipped:
+            stats[page_item.rate] = stats[page_item.rate] + 1
 
         # clean up unnecessary fields for the response
         page_item.clean_fields(show_top_features=show_top_features)
@@ -1,12 +1,51 @@
+import os
+import posixpath
 import re
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from itertools import repeat
+from multiprocessing import get_context
 
 import nltk
 
 from src.core.featureextractor.default_resource import DefaultResource
+from src.core.model.resource import Lang
 from src.utils.logger import logger
 
-nltk.download("stopwords")
-nltk.download("wordnet")
+# corpora used by the tokenization, downloaded by src/setup_nltk.py
+nltk_corpora = ["stopwords", "wordnet"]
+
+nltk_data_dir_default = "nltk_data"
+
+
+def get_nltk_data_dir(settings: dict) -> str:
+    # relative to src
+    nltk_data_dir = settings["main"].get("tokenization", {}).get("nltk_data_dir", nltk_data_dir_default)
+    return posixpath.normpath(os.path.join(os.path.dirname(__file__), "../..", nltk_data_dir))
+
+
+# tokenization manager of a worker process of tokenize_many
+worker_token_mgr = None
+
+
+def init_worker(settings: dict) -> None:
+    global worker_token_mgr
+    worker_token_mgr = TokenizationMgr(settings)
+    worker_token_mgr.warm_up()
+
+
+def tokenize_chunk(values: list, lang: str) -> list:
+    return [worker_token_mgr.tokenize(value, lang) for value in values]
+
+
+def substrings(words: list, min_len: int) -> frozenset:
+    return frozenset(
+        word[start:end]
+        for word in words
+        for start in range(len(word))
+        for end in range(start + min_len, len(word) + 1)
+    )
 
 
 class TokenizationMgr:
@@ -29,9 +68,68 @@ class TokenizationMgr:
 
     specialchars = r"[“„!\"#$%&\\'()*+,-./:;<=>?@\[\]^_`{}\|~«»£—’‘…”™°]"
 
+    # special chars are replaced by a whitespace and whitespaces are collapsed after, so a run of both
+    # becomes one whitespace in a single pass
+    specialchars_or_spaces = re.compile(r"(?:" + specialchars + r"|\s)+")
+
+    # tokens which are part of a useless word, a token must be longer than min_token_len anyway
+    useless_parts = substrings(useless_words, min_token_len + 1)
+
+    # stopwords pro language, loaded once
+    stopwords = {}
+
+    lemma_cache_size_default = 100000
+
+    # tokenize_many uses a process pool starting with this amount of values
+    parallel_min_values_default = 5000
+    chunk_size_default = 500
+
     def __init__(self, settings: dict):
         self.settings = settings
 
+        # corpora are loaded lazily from the local data directory, they are never downloaded at runtime
+        nltk_data_dir = get_nltk_data_dir(settings)
+        if nltk_data_dir not in nltk.data.path:
+            nltk.data.path.insert(0, nltk_data_dir)
+
+        # web vocabulary is repetitive, remember lemmas and stems of the most recent tokens.
+        # Cached pro (token, speach rule), lru_cache is thread-safe
+        tokenization_settings = settings["main"].get("tokenization", {})
+        lemma_cache_size = tokenization_settings.get(
+            "lemma_cache_size", self.lemma_cache_size_default
+        )
+        self.lemmatize = lru_cache(maxsize=lemma_cache_size)(self.lemmatizer.lemmatize)
+        self.stem = lru_cache(maxsize=lemma_cache_size)(self.stemmer.stem)
+
+        # 0 means a worker pro cpu
+        self.workers = tokenization_settings.get("workers", 0) or os.cpu_count() or 1
+        self.parallel_min_values = tokenization_settings.get(
+            "parallel_min_values", self.parallel_min_values_default
+        )
+        self.chunk_size = tokenization_settings.get(
+            "chunk_size", self.chunk_size_default
+        )
+
+    def warm_up(self) -> None:
+        """
+        Load the stopwords of all supported languages and WordNet, so that the first tokenization
+        does not pay for it.
+
+        Raises:
+            LookupError: corpora are not installed
+        """
+        try:
+            for lang in Lang:
+                self.get_stopwords(lang.value)
+            self.lemmatizer.lemmatize("warming", self.default_lemmating_speach_rule)
+        except LookupError as e:
+            logger.error(
+                "nltk corpora %s are not found in %s, install them with `make nltk-data`",
+                nltk_corpora,
+                nltk.data.path,
+            )
+            raise e
+
     def tokenize(self, value: str, lang: str) -> str:
         value = self._cleanup_and_simplify(value)
 
@@ -41,6 +139,50 @@ class TokenizationMgr:
         value = value.strip()
         return value
 
+    def tokenize_many(self, values: list, lang: str) -> list:
+        """
+        Tokenize the values of one language, the result is the same as of `tokenize` called for every value.
+
+        Small batches are tokenized in this process. Batches of at least `parallel_min_values` values
+        (the features of all analysed resources, see `ResourceMgr.analyse_resources`) are split in chunks
+        of `chunk_size` values and tokenized by a pool of `workers` processes, which is started for the batch.
+
+        Args:
+            values: values to be tokenized
+            lang: language of the values
+
+        Returns: tokenized values in the order of the given values
+        """
+        if self.workers < 2 or len(values) < self.parallel_min_values:
+            return [self.tokenize(value, lang) for value in values]
+
+        chunks = [
+            values[start : start + self.chunk_size]
+            for start in range(0, len(values), self.chunk_size)
+        ]
+        workers = min(self.workers, len(chunks))
+        logger.info(
+            "tokenize %s values in %s chunks with %s processes", len(values), len(chunks), workers
+        )
+
+        try:
+            # spawn, forking a process with running fetcher threads is not safe
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=get_context("spawn"),
+                initializer=init_worker,
+                initargs=(self.settings,),
+            ) as executor:
+                tokenized = []
+                for chunk in executor.map(tokenize_chunk, chunks, repeat(lang)):
+                    tokenized += chunk
+                return tokenized
+        except BrokenProcessPool as e:
+            logger.error(
+                "process pool of the tokenization is broken, tokenize in this process: %s", e
+            )
+            return [self.tokenize(value, lang) for value in values]
+
     def _allow_token(self, token: str):
         if (
             not token
@@ -51,11 +193,8 @@ class TokenizationMgr:
             return False
 
         # check if useless word is part of token or token is part of useless word
-        if any(
-            [
-                token in useless_word or useless_word in token
-                for useless_word in self.useless_words
-            ]
+        if token in self.useless_parts or any(
+            useless_word in token for useless_word in self.useless_words
         ):
             return False
 
@@ -63,40 +202,61 @@ class TokenizationMgr:
         return True
 
     def _tokenize_values(self, val: str, lang: str) -> str:
-        tokens = val.split(" ")
+        stopwords = self.get_stopwords(lang)
+        lemmatize = self.lemmatize
+        speach_rule = self.default_lemmating_speach_rule
+
+        # remove stop words, lemmatize or stem and filter empty or small words in one pass
+        allowed_tokens = []
+        for token in val.split(" "):
+            if token in stopwords:
+                continue
 
-        # remove stop words
-        tokens = TokenizationMgr.remove_stop_words(tokens, lang)
+            if self.do_lemmating is True:
+                token = lemmatize(token, speach_rule)
 
-        if self.do_lemmating is True:
-            tokens = self._lemmatization(tokens, self.default_lemmating_speach_rule)
+            if self.do_stemming is True:
+                token = self.stem(token)
 
-        if self.do_stemming is True:
-            tokens = self._stemming(tokens)
+            if self._allow_token(token):
+                allowed_tokens.append(token)
 
-        # filter empty or small words
-        allowed_tokens = [token for token in tokens if self._allow_token(token)]
         return " ".join(allowed_tokens)
 
     def _stemming(self, values):
-        return [self.stemmer.stem(value) for value in values]
+        return [self.stem(value) for value in values]
 
     def _lemmatization(self, values, speach_rule="n"):
-        return [self.lemmatizer.lemmatize(value, speach_rule) for value in values]
+        return [self.lemmatize(value, speach_rule) for value in values]
+
+    def cache_info(self) -> dict:
+        return {
+            name: cache.cache_info()._asdict()
+            for name, cache in [("lemmatize", self.lemmatize), ("stem", self.stem)]
+        }
+
+    @classmethod
+    def get_stopwords(cls, lang: str) -> frozenset:
+        if (stopwords := cls.stopwords.get(lang)) is not None:
+            return stopwords
 
-    @staticmethod
-    def remove_stop_words(values, lang):
-        # usage example (will remove "von" tokens):
         try:
-            stopwords = nltk.corpus.stopwords.words(lang)
+            stopwords = frozenset(nltk.corpus.stopwords.words(lang))
         except IOError as e:
             logger.error(
                 "nltk stopwords don`t support the language {}: Error: {}".format(
                     lang, str(e)
                 )
             )
-            stopwords = nltk.corpus.stopwords.words(DefaultResource.default_lang)
+            stopwords = cls.get_stopwords(DefaultResource.default_lang)
 
+        cls.stopwords[lang] = stopwords
+        return stopwords
+
+    @staticmethod
+    def remove_stop_words(values, lang):
+        # usage example (will remove "von" tokens):
+        stopwords = TokenizationMgr.get_stopwords(lang)
         filtered_tokens = [value for value in values if value not in stopwords]
         return filtered_tokens
 
@@ -124,10 +284,7 @@ class TokenizationMgr:
         :param str_val: String which should be cleaned up
         :return: clean string
         """
-        str_val = re.sub(cls.specialchars, " ", str_val)
-
-        # remove multiple spaces
-        str_val = re.sub(r"\s+", " ", str_val)
+        str_val = cls.specialchars_or_spaces.sub(" ", str_val)
 
         # FIX: postgres issue: A string literal cannot contain NUL (0x00) characters
         str_val = str_val.replace("\x00", "")
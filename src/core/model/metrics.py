@@ -0,0 +1,23 @@
+from pydantic import BaseModel, Field
+
+
+class FetchMetricsGetIn(BaseModel):
+    limit: int | None = Field(default=100, ge=1, le=1000)
+
+
+class TokenizationMetricsGetIn(BaseModel):
+    pass
+
+
+class TokenizationMetricsGetOut(BaseModel):
+    # hits, misses, maxsize and currsize of the caches
+    lemmatize: dict
+    stem: dict
+
+
+class FetchMetricsGetOut(BaseModel):
+    fetchers: dict
+    politeness: dict | None = None
+    open_breakers: list | None = None
+    failed_urls_qty: int | None = None
+    failed_urls: list | None = None
@@ -14,6 +14,10 @@ class TaskCreateIn(BaseModel):
     lang: Literal[Lang.english, Lang.german, Lang.russian] | None = None
     recheck: bool | None = False
 
+    # limited by the configured budgets
+    time_budget: int | None = Field(default=None, ge=1)
+    page_budget: int | None = Field(default=None, ge=1)
+
 
 class TaskGetIn(BaseModel):
     uuid: UUID = Field(default_factory=uuid4)
@@ -1,24 +1,33 @@
-import re
 from typing import Callable
 
-from bs4 import BeautifulSoup
 from fastapi import HTTPException
 
 from src.core.app_error import AppError
+from src.core.featureextractor.html_extractor import extract_document
 from src.utils.logger import logger
 
 
-def parse(url: str, fetch: Callable) -> BeautifulSoup:
-    content = fetch(url)
-    return BeautifulSoup(content, "html.parser")
+def parse(url: str, fetch: Callable) -> tuple:
+    """
+    Fetch the url with the given fetcher and parse the page.
+
+    Returns: fetch result and parsed page content
+    """
+    result = fetch(url)
+    return result, extract_document(result.body)
 
 
 def get_content_by_val_and_collect_links(
     fetch: Callable, url: str, collect_links: bool = False
-):
+) -> tuple | None:
+    """
+    Fetch and parse the page, collect its links if asked.
+
+    Returns: fetch result, parsed page content and links, or None if the page cannot be fetched
+    """
     try:
         logger.info("start parsing resource: %s", url)
-        content = parse(url, fetch)
+        result, content = parse(url, fetch)
         logger.info("end parsing resource: %s", url)
     except HTTPException as e:
         logger.info("end parsing resource: %s with an error %s", url, str(e))
@@ -26,14 +35,9 @@ def get_content_by_val_and_collect_links(
 
     links = []
     if collect_links:
-        for link in content.findAll(
-            "a", attrs={"href": re.compile("^(http|https)://.*$")}
-        ):
-            href = link.get("href")
-            if href not in links:
-                links.append(href)
-
-    return links
+        links = content.links
+
+    return result, content, links
 
 
 def log_and_raise_compact_err(err: str) -> None:
@@ -0,0 +1,102 @@
+import codecs
+import re
+
+import requests
+from charset_normalizer import from_bytes
+
+# bytes at the beginning of the body searched for a charset declaration
+charset_sniff_bytes = 4096
+
+meta_charset = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?\s*([a-zA-Z0-9_:.-]+)""", re.IGNORECASE)
+
+boms = [
+    (codecs.BOM_UTF8, "utf-8"),
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+]
+
+
+def parse_content_type(value: str | None) -> tuple[str | None, str | None]:
+    """
+    Split the Content-Type header into the media type and the charset.
+
+    Returns: lower cased media type and charset, both None if not given
+    """
+    if not value:
+        return None, None
+
+    parts = [part.strip() for part in value.split(";")]
+    media_type = parts[0].lower() or None
+
+    charset = None
+    for part in parts[1:]:
+        name, _, param = part.partition("=")
+        if name.strip().lower() == "charset" and param:
+            charset = param.strip().strip("\"'")
+
+    return media_type, charset
+
+
+def is_known_charset(charset: str | None) -> bool:
+    if not charset:
+        return False
+
+    try:
+        codecs.lookup(charset)
+    except LookupError:
+        return False
+    return True
+
+
+def detect_charset(body: bytes, header_charset: str | None = None) -> str:
+    """
+    Detect the charset of the body: the charset of the Content-Type header first, then a byte order mark,
+    then a meta declaration and at last the guess of charset_normalizer.
+
+    Returns: name of the charset
+    """
+    if is_known_charset(header_charset):
+        return header_charset
+
+    for bom, charset in boms:
+        if body.startswith(bom):
+            return charset
+
+    if match := meta_charset.search(body[:charset_sniff_bytes]):
+        charset = match.group(1).decode("ascii", errors="ignore")
+        if is_known_charset(charset):
+            return charset
+
+    if guess := from_bytes(body[:charset_sniff_bytes * 16]).best():
+        return guess.encoding
+
+    return "utf-8"
+
+
+def read_body(response: requests.Response, max_bytes: int) -> tuple[bytes, bool]:
+    """
+    Read the body of a streamed response up to max_bytes.
+
+    Args:
+        response: response requested with `stream=True`
+        max_bytes: max bytes to be read, 0 means no limit
+
+    Returns: read body and whether the body is truncated
+    """
+    chunks = []
+    size = 0
+    truncated = False
+    for chunk in response.iter_content(chunk_size=64 * 1024):
+        chunks.append(chunk)
+        size += len(chunk)
+        # read past the cap to know whether the body goes on
+        if max_bytes and size > max_bytes:
+            truncated = True
+            break
+
+    body = b"".join(chunks)
+    if truncated:
+        body = body[:max_bytes]
+    return body, truncated
@@ -0,0 +1,159 @@
+import atexit
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+from selenium import webdriver
+
+from src.utils.logger import logger
+
+
+class BrowserPool:
+    """
+    Bounded pool of warm browser instances which are leased pro fetch.
+
+    Instances are created lazily up to the pool size. After every lease cookies, storages and caches of all
+    visited origins are cleared and the browser goes back to a blank page. An instance is recycled (quit and
+    replaced on the next lease) after `max_uses` leases or if it cannot be reset anymore, e.g. because it crashed.
+    """
+
+    pool_size_default = 2
+    max_uses_default = 50
+    lease_timeout_default = 60
+
+    def __init__(self, settings: dict, create_driver: Callable[[], webdriver.Firefox]):
+        self.settings = settings
+        self.create_driver = create_driver
+
+        browser_settings = settings["main"].get("fetch", {}).get("browser", {})
+        self.pool_size = browser_settings.get("pool_size", self.pool_size_default)
+        self.max_uses = browser_settings.get("max_uses", self.max_uses_default)
+        self.lease_timeout = browser_settings.get(
+            "lease_timeout", self.lease_timeout_default
+        )
+
+        self.slots = threading.BoundedSemaphore(self.pool_size)
+        self.idle = queue.LifoQueue()
+        self.uses = {}
+        self.lock = threading.Lock()
+
+        self.metrics = {
+            "created": 0,
+            "recycled": 0,
+            "leases": 0,
+            "lease_wait_total": 0.0,
+            "lease_wait_max": 0.0,
+        }
+
+        # don't leave orphaned browser and geckodriver processes behind
+        atexit.register(self.close)
+
+    @contextmanager
+    def lease(self) -> Iterator[webdriver.Firefox]:
+        started = time.monotonic()
+        if not self.slots.acquire(timeout=self.lease_timeout):
+            raise TimeoutError(
+                f"no browser became free within {self.lease_timeout} seconds"
+            )
+
+        driver = None
+        try:
+            self._register_lease(time.monotonic() - started)
+            driver = self._take()
+            yield driver
+        finally:
+            if driver is not None:
+                self._give_back(driver)
+            self.slots.release()
+
+    def stats(self) -> dict:
+        with self.lock:
+            metrics = dict(self.metrics)
+            in_use = len(self.uses) - self.idle.qsize()
+
+        leases = metrics["leases"]
+        metrics["lease_wait_avg"] = (
+            metrics["lease_wait_total"] / leases if leases else 0.0
+        )
+        metrics["pool_size"] = self.pool_size
+        metrics["in_use"] = in_use
+        metrics["idle"] = self.idle.qsize()
+        return metrics
+
+    def close(self) -> None:
+        while True:
+            try:
+                driver = self.idle.get_nowait()
+            except queue.Empty:
+                break
+            self._quit(driver)
+
+    def _register_lease(self, waited: float) -> None:
+        with self.lock:
+            self.metrics["leases"] += 1
+            self.metrics["lease_wait_total"] += waited
+            self.metrics["lease_wait_max"] = max(self.metrics["lease_wait_max"], waited)
+
+        logger.info("Browser leased after waiting %.3f seconds", waited)
+
+    def _take(self) -> webdriver.Firefox:
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        driver = self.create_driver()
+        with self.lock:
+            self.uses[id(driver)] = 0
+            self.metrics["created"] += 1
+        return driver
+
+    def _give_back(self, driver: webdriver.Firefox) -> None:
+        with self.lock:
+            self.uses[id(driver)] += 1
+            uses = self.uses[id(driver)]
+
+        if uses >= self.max_uses or not self._reset(driver):
+            with self.lock:
+                self.metrics["recycled"] += 1
+            self._quit(driver)
+            return
+
+        self.idle.put(driver)
+
+    # cookies, storages, caches and permissions of all origins, not only of the currently opened page
+    clear_data_script = """
+        const done = arguments[arguments.length - 1];
+        Services.clearData.deleteData(Ci.nsIClearDataService.CLEAR_ALL, () => done(true));
+    """
+
+    @classmethod
+    def _reset(cls, driver: webdriver.Firefox) -> bool:
+        """
+        Clear the data of all visited origins and go back to a blank page.
+
+        The data is cleared by the clear data service of firefox in the privileged (chrome) context, the
+        webdriver commands only reach the cookies and storages of the currently opened page.
+
+        Returns: False if the browser cannot be reset and should be recycled
+        """
+        try:
+            with driver.context(driver.CONTEXT_CHROME):
+                driver.execute_async_script(cls.clear_data_script)
+            driver.get("about:blank")
+            return True
+        except Exception as e:
+            # a browser which keeps data of a previous lease is not used again, a new one gets a fresh profile
+            logger.error("Browser cannot be reset and is recycled: %s", str(e)[0:255])
+            return False
+
+    def _quit(self, driver: webdriver.Firefox) -> None:
+        with self.lock:
+            self.uses.pop(id(driver), None)
+
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.error("Browser cannot be quit: %s", str(e)[0:255])
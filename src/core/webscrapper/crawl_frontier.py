@@ -0,0 +1,73 @@
+from src.core.helper.url import canonicalize_url
+
+
+class CrawlFrontier:
+    """
+    Visited index of one crawl.
+
+    Links are canonicalized, so that the same page behind different spellings (case of scheme and host,
+    default port, fragment, trailing slash, order of query parameters, tracking parameters) is scheduled
+    only once. The canonical url is only the key of the index, pages are referenced, fetched and stored by
+    the link as found on the page. Pages seen before are still referenced by the page tree but not fetched
+    again. New pages are only admitted while the page budget of the crawl is not exhausted, pages beyond the
+    budget are referenced as skipped.
+    """
+
+    def __init__(self, tracking_params: list | None = None, max_pages: int = 0):
+        self.tracking_params = [param.lower() for param in tracking_params or []]
+
+        # 0 means no limit
+        self.max_pages = max_pages
+
+        self.seen = set()
+
+    def canonicalize(self, url: str) -> str:
+        return canonicalize_url(url, self.tracking_params)
+
+    def is_exhausted(self) -> bool:
+        return 0 < self.max_pages <= len(self.seen)
+
+    def add(self, url: str) -> bool:
+        """
+        Admit the url to the crawl.
+
+        Returns: True if the url is new and admitted, False if it was seen before or the budget is exhausted
+        """
+        url = self.canonicalize(url)
+        if url in self.seen or self.is_exhausted():
+            return False
+
+        self.seen.add(url)
+        return True
+
+    def filter_links(self, links: list) -> tuple[list, list, list]:
+        """
+        De-duplicate the links of a page by their canonical url.
+
+        Args:
+            links: links found on a page
+
+        Returns: links to be referenced by the page, the newly admitted ones among them and the ones beyond the
+            page budget among them, as found on the page
+        """
+        page_links = []
+        new_links = []
+        skipped_links = []
+        page_seen = set()
+
+        for link in links:
+            canonical_link = self.canonicalize(link)
+            if canonical_link in page_seen:
+                continue
+
+            if canonical_link not in self.seen:
+                if self.add(link):
+                    new_links.append(link)
+                else:
+                    # the page budget is exhausted, the page is referenced as skipped
+                    skipped_links.append(link)
+
+            page_seen.add(canonical_link)
+            page_links.append(link)
+
+        return page_links, new_links, skipped_links
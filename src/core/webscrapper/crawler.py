@@ -0,0 +1,270 @@
+import asyncio
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+
+from src.core.entity.page_item import PageItem
+from src.core.helper.url import canonicalize_url, get_domain_name_from_url
+from src.core.webscrapper import get_content_by_val_and_collect_links
+from src.core.webscrapper.crawl_frontier import CrawlFrontier
+from src.utils.logger import logger
+
+
+def interleave_by_host(page_items: list) -> list:
+    """
+    Order page items round-robin by host, so that a host with many pages does not delay all other hosts.
+    """
+    pages_by_host = defaultdict(list)
+    for page_item in page_items:
+        pages_by_host[get_domain_name_from_url(page_item.link)].append(page_item)
+
+    queues = list(pages_by_host.values())
+    return [
+        queue[num]
+        for num in range(max(map(len, queues), default=0))
+        for queue in queues
+        if num < len(queue)
+    ]
+
+
+@dataclass
+class CrawlRun:
+    """
+    State of one crawl.
+    """
+
+    collect_links: bool
+
+    frontier: CrawlFrontier
+
+    # no fetch is started after this time (monotonic clock), None means no limit
+    deadline: float | None = None
+
+    # fetch result and parsed content pro canonical link
+    fetched_pages: dict = field(default_factory=dict)
+
+    # canonical links of the pages not fetched because of the time or the page budget
+    skipped: set = field(default_factory=set)
+
+    def is_expired(self) -> bool:
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def skip(self, link: str) -> None:
+        self.skipped.add(self.frontier.canonicalize(link))
+
+
+class Crawler:
+    """
+    Crawls a tree of page items depth by depth.
+
+    All pages of one depth level are fetched concurrently. The amount of parallel fetches is bounded by
+    a global limit and by a limit per host. Fetchers are blocking callables (requests, selenium), therefore
+    they are executed in a thread pool sized by the global limit.
+
+    The parsed content of every fetched page is kept, so that the features of the page can be extracted
+    without fetching it again.
+
+    Every page is fetched once pro crawl, a page linked again (in any spelling) is only referenced in the
+    page tree, see CrawlFrontier. Therefore the fetched pages are kept by their canonical link, see
+    `canonicalize`.
+    """
+
+    concurrency_default = 16
+    concurrency_per_host_default = 4
+    max_pages_default = 500
+
+    def __init__(self, settings: dict, fetchers: list, fetch_strategy_mgr=None):
+        self.settings = settings
+        self.fetchers = fetchers
+        self.fetch_strategy_mgr = fetch_strategy_mgr
+
+        crawler_settings = settings["main"]["task"].get("crawler", {})
+        self.concurrency = crawler_settings.get(
+            "concurrency", self.concurrency_default
+        )
+        self.concurrency_per_host = crawler_settings.get(
+            "concurrency_per_host", self.concurrency_per_host_default
+        )
+        self.max_pages = crawler_settings.get("max_pages", self.max_pages_default)
+        self.tracking_params = [
+            param.lower() for param in crawler_settings.get("tracking_params", [])
+        ]
+
+    def crawl(
+        self,
+        root_page_item: PageItem,
+        max_depth: int,
+        time_budget: int | None = None,
+        page_budget: int | None = None,
+    ) -> dict:
+        """
+        Collect links pro depth and attach them as subpages to the given root page item.
+        Even if max_depth is 0, the root page is fetched.
+
+        No new fetch is started after the time budget ran out and no new page is admitted after the page
+        budget ran out. Pages not fetched because of a budget are marked as skipped in the page tree:
+        - time budget: pages scheduled to be fetched (pages up to max_depth - 1) but not fetched in time
+        - page budget: pages beyond the budget, on every depth
+
+        Pages on max_depth are never fetched by the crawl, they are only referenced (their features are extracted
+        while the prediction). Therefore they are not skipped because of the time budget, independent of when
+        it ran out.
+
+        Args:
+            root_page_item: root page of the task
+            max_depth: max depth of the task
+            time_budget: max seconds of the crawl, None means no limit
+            page_budget: max pages of the crawl, None means the configured max pages
+
+        Returns: fetch result and parsed content pro canonical link of all fetched pages
+        """
+        run = CrawlRun(
+            collect_links=max_depth > 0,
+            frontier=CrawlFrontier(
+                self.tracking_params,
+                page_budget if page_budget is not None else self.max_pages,
+            ),
+            deadline=time.monotonic() + time_budget if time_budget else None,
+        )
+        fetched_pages = asyncio.run(self._crawl(root_page_item, max_depth, run))
+
+        if run.skipped:
+            skipped = self._mark_skipped([root_page_item], run.skipped)
+            logger.warning(
+                "%s pages are skipped while crawling %s within the budgets of %s seconds and %s pages",
+                skipped,
+                root_page_item.link,
+                time_budget,
+                run.frontier.max_pages,
+            )
+
+        return fetched_pages
+
+    def canonicalize(self, url: str) -> str:
+        """
+        Returns: key of the url in the fetched pages of a crawl
+        """
+        return canonicalize_url(url, self.tracking_params)
+
+    def _mark_skipped(self, page_items: list, skipped_links: set) -> int:
+        # a skipped page is marked wherever it is referenced in the tree
+        skipped = 0
+        for page_item in page_items:
+            if self.canonicalize(page_item.link) in skipped_links:
+                page_item.skipped = True
+                skipped += 1
+            skipped += self._mark_skipped(page_item.pages, skipped_links)
+        return skipped
+
+    def collect_links(self, url: str, collect_links: bool) -> tuple | None:
+        fetchers = self.fetchers
+        if self.fetch_strategy_mgr:
+            fetchers = self.fetch_strategy_mgr.order(url, fetchers)
+
+        fetched = None
+        for fetcher in fetchers:
+            started = time.perf_counter()
+            fetched = get_content_by_val_and_collect_links(
+                fetcher["fetch"], url, collect_links
+            )
+            if self.fetch_strategy_mgr:
+                self.fetch_strategy_mgr.record(
+                    url, fetcher["name"], fetched is not None, time.perf_counter() - started
+                )
+            if fetched is not None:
+                break
+        return fetched
+
+    async def _crawl(self, root_page_item: PageItem, max_depth: int, run: CrawlRun) -> dict:
+        executor = ThreadPoolExecutor(max_workers=self.concurrency)
+        global_limit = asyncio.Semaphore(self.concurrency)
+        host_limits = defaultdict(lambda: asyncio.Semaphore(self.concurrency_per_host))
+        run.frontier.add(root_page_item.link)
+
+        try:
+            current_depth = 0
+            pages = [root_page_item]
+            while pages:
+                new_pages = await asyncio.gather(
+                    *[
+                        self._visit(
+                            executor, page_item, run, global_limit, host_limits
+                        )
+                        for page_item in pages
+                    ]
+                )
+                new_pages = [page_item for page_items in new_pages for page_item in page_items]
+
+                if (current_depth + 1) >= max_depth:
+                    # pages on max depth are only referenced
+                    break
+
+                if run.is_expired():
+                    # the pages of the next depth were scheduled, but are not fetched anymore
+                    for page_item in new_pages:
+                        run.skip(page_item.link)
+                    break
+
+                current_depth += 1
+                pages = interleave_by_host(new_pages)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        return run.fetched_pages
+
+    async def _visit(
+        self,
+        executor: ThreadPoolExecutor,
+        page_item: PageItem,
+        run: CrawlRun,
+        global_limit: asyncio.Semaphore,
+        host_limits: dict,
+    ) -> list:
+        loop = asyncio.get_running_loop()
+        host = get_domain_name_from_url(page_item.link)
+
+        # take the host slot first, so that pages of a busy host do not hold global slots while waiting
+        async with host_limits[host]:
+            async with global_limit:
+                # don't start new fetches after the time budget ran out
+                if run.is_expired():
+                    run.skip(page_item.link)
+                    return []
+
+                fetched = await loop.run_in_executor(
+                    executor, self.collect_links, page_item.link, run.collect_links
+                )
+
+        if fetched is None:
+            logger.warning(
+                "cannot collect any link, something wrong went here: %s",
+                page_item.link,
+            )
+            return []
+
+        result, content, links = fetched
+
+        # only the parsed content is needed further, do not keep the bodies of all pages in memory
+        run.fetched_pages[run.frontier.canonicalize(page_item.link)] = (
+            replace(result, body=""),
+            content,
+        )
+
+        if len(links) == 0:
+            return []
+
+        # pages seen before are referenced, only new pages are visited on the next depth
+        page_links, new_links, skipped_links = run.frontier.filter_links(links)
+        new_links = set(new_links)
+        for link in skipped_links:
+            run.skip(link)
+
+        # creates new page-items from getting links
+        page_item.create_pages_by_links(page_links)
+
+        return [
+            page_item_new
+            for page_item_new in page_item.pages
+            if page_item_new.link in new_links
+        ]
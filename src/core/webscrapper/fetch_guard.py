@@ -0,0 +1,219 @@
+import os
+import posixpath
+import sqlite3
+import threading
+import time
+from typing import Callable
+
+from fastapi import HTTPException
+
+from src.core.app_error import AppError
+from src.core.helper.url import get_domain_name_from_url, normalize_url
+from src.core.webscrapper.host_scheduler import HostSlotTimeout
+from src.utils.logger import logger
+
+
+class FetchGuard:
+    """
+    Skips fetches which are known to fail.
+
+    - negative cache: a failed url is not fetched again before its retry time. The retry time grows
+      exponentially with the amount of failures in a row
+    - circuit breaker: after `breaker_threshold` failures in a row of a domain, the domain is not fetched
+      for `breaker_cooldown` seconds. After the cool-down the next fetch is let through, a success closes
+      the breaker again and a failure opens it for another cool-down
+
+    The state is kept pro fetcher in a sqlite database in the cache directory, so the api and the cron jobs
+    share it.
+    """
+
+    curr_dir = os.path.dirname(__file__)
+
+    dir_default = "cache"
+    backoff_base_default = 60
+    backoff_max_default = 24 * 3600
+    breaker_threshold_default = 5
+    breaker_cooldown_default = 600
+
+    def __init__(self, settings: dict):
+        self.settings = settings
+
+        fetch_settings = settings["main"].get("fetch", {})
+        guard_settings = fetch_settings.get("guard", {})
+        self.backoff_base = guard_settings.get("backoff_base", self.backoff_base_default)
+        self.backoff_max = guard_settings.get("backoff_max", self.backoff_max_default)
+        self.breaker_threshold = guard_settings.get(
+            "breaker_threshold", self.breaker_threshold_default
+        )
+        self.breaker_cooldown = guard_settings.get(
+            "breaker_cooldown", self.breaker_cooldown_default
+        )
+
+        cache_dir = posixpath.normpath(
+            os.path.join(
+                self.curr_dir,
+                "../..",
+                fetch_settings.get("cache", {}).get("dir", self.dir_default),
+            )
+        )
+        os.makedirs(cache_dir, exist_ok=True)
+
+        # runtime state next to the page cache, the cache directory is not part of the repository
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(
+            os.path.join(cache_dir, "guard.sqlite"),
+            timeout=30,
+            check_same_thread=False,
+            isolation_level=None,
+        )
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS failed_urls (fetcher TEXT NOT NULL, url TEXT NOT NULL, "
+            "failures INTEGER NOT NULL, retry_at REAL NOT NULL, last_error TEXT, PRIMARY KEY (fetcher, url))"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS breakers (fetcher TEXT NOT NULL, domain TEXT NOT NULL, "
+            "failures INTEGER NOT NULL, open_until REAL NOT NULL, last_error TEXT, PRIMARY KEY (fetcher, domain))"
+        )
+
+    def guard(self, name: str, fetch: Callable) -> Callable:
+        """
+        Wrap the fetch callable of a fetcher, so that known failures are skipped and new outcomes are registered.
+
+        Args:
+            name: name of the fetcher
+            fetch: fetch callable of the fetcher
+
+        Returns: guarded fetch callable
+        """
+
+        def guarded_fetch(url: str):
+            self.check(name, url)
+            try:
+                result = fetch(url)
+            except HostSlotTimeout:
+                # the host is busy, the page is not fetched and not failed
+                raise
+            except HTTPException as e:
+                self.register_failure(name, url, str(e.detail))
+                raise e
+            self.register_success(name, url)
+            return result
+
+        return guarded_fetch
+
+    def check(self, name: str, url: str) -> None:
+        now = time.time()
+        key = normalize_url(url)
+        domain = get_domain_name_from_url(url)
+
+        with self.lock:
+            failed_url = self.conn.execute(
+                "SELECT retry_at FROM failed_urls WHERE fetcher = ? AND url = ?",
+                (name, key),
+            ).fetchone()
+            breaker = self.conn.execute(
+                "SELECT open_until FROM breakers WHERE fetcher = ? AND domain = ?",
+                (name, domain),
+            ).fetchone()
+
+        if breaker and breaker[0] > now:
+            raise AppError.resource_not_fetchable(
+                f"url: {url} -> domain is skipped for {int(breaker[0] - now)} seconds after repeated failures"
+            )
+
+        if failed_url and failed_url[0] > now:
+            raise AppError.resource_not_fetchable(
+                f"url: {url} -> url is skipped for {int(failed_url[0] - now)} seconds after a failure"
+            )
+
+    def register_failure(self, name: str, url: str, error: str) -> None:
+        now = time.time()
+        key = normalize_url(url)
+        domain = get_domain_name_from_url(url)
+        error = error[0:255]
+
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT failures FROM failed_urls WHERE fetcher = ? AND url = ?",
+                (name, key),
+            ).fetchone()
+            failures = row[0] + 1 if row else 1
+            backoff = min(self.backoff_base * 2 ** (failures - 1), self.backoff_max)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO failed_urls (fetcher, url, failures, retry_at, last_error) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (name, key, failures, now + backoff, error),
+            )
+
+            row = self.conn.execute(
+                "SELECT failures FROM breakers WHERE fetcher = ? AND domain = ?",
+                (name, domain),
+            ).fetchone()
+            domain_failures = row[0] + 1 if row else 1
+            open_until = 0.0
+            if domain_failures >= self.breaker_threshold:
+                open_until = now + self.breaker_cooldown
+                logger.warning(
+                    "Circuit breaker of %s is open for domain %s after %s failures",
+                    name,
+                    domain,
+                    domain_failures,
+                )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO breakers (fetcher, domain, failures, open_until, last_error) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (name, domain, domain_failures, open_until, error),
+            )
+
+    def register_success(self, name: str, url: str) -> None:
+        with self.lock:
+            self.conn.execute(
+                "DELETE FROM failed_urls WHERE fetcher = ? AND url = ?",
+                (name, normalize_url(url)),
+            )
+            self.conn.execute(
+                "DELETE FROM breakers WHERE fetcher = ? AND domain = ?",
+                (name, get_domain_name_from_url(url)),
+            )
+
+    def stats(self, limit: int = 100) -> dict:
+        now = time.time()
+        with self.lock:
+            breakers = self.conn.execute(
+                "SELECT fetcher, domain, failures, open_until, last_error FROM breakers WHERE open_until > ? "
+                "ORDER BY open_until DESC LIMIT ?",
+                (now, limit),
+            ).fetchall()
+            failed_urls = self.conn.execute(
+                "SELECT fetcher, url, failures, retry_at, last_error FROM failed_urls WHERE retry_at > ? "
+                "ORDER BY retry_at DESC LIMIT ?",
+                (now, limit),
+            ).fetchall()
+            (failed_urls_qty,) = self.conn.execute(
+                "SELECT COUNT(*) FROM failed_urls WHERE retry_at > ?", (now,)
+            ).fetchone()
+
+        return {
+            "open_breakers": [
+                {
+                    "fetcher": fetcher,
+                    "domain": domain,
+                    "failures": failures,
+                    "open_for_seconds": int(open_until - now),
+                    "last_error": last_error,
+                }
+                for fetcher, domain, failures, open_until, last_error in breakers
+            ],
+            "failed_urls_qty": failed_urls_qty,
+            "failed_urls": [
+                {
+                    "fetcher": fetcher,
+                    "url": url,
+                    "failures": failures,
+                    "retry_in_seconds": int(retry_at - now),
+                    "last_error": last_error,
+                }
+                for fetcher, url, failures, retry_at, last_error in failed_urls
+            ],
+        }
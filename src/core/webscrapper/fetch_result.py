@@ -0,0 +1,29 @@
+import hashlib
+from dataclasses import dataclass
+
+
+def hash_content(body: str) -> str:
+    return hashlib.sha256(body.encode("utf-8", errors="ignore")).hexdigest()
+
+
+@dataclass
+class FetchResult:
+    url: str
+    body: str
+
+    # validators given by the origin, used for conditional requests
+    etag: str | None = None
+    last_modified: str | None = None
+
+    # hash of the body, the same hash means the same content
+    content_hash: str | None = None
+
+    # the body is taken from the page cache (fresh or revalidated by the origin)
+    from_cache: bool = False
+
+    # the body is cut after the max bytes to be read
+    truncated: bool = False
+
+    def __post_init__(self):
+        if self.content_hash is None:
+            self.content_hash = hash_content(self.body)
@@ -0,0 +1,237 @@
+import http
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+from fastapi import HTTPException
+from starlette import status
+
+from src.core.helper.url import get_domain_name_from_url
+from src.utils.logger import logger
+
+# responses asking to slow down
+throttle_status_codes = frozenset(
+    [status.HTTP_429_TOO_MANY_REQUESTS, status.HTTP_503_SERVICE_UNAVAILABLE]
+)
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """
+    Parse the Retry-After header given either as seconds or as http date.
+
+    Returns: seconds to wait or None if the header is not given or cannot be parsed
+    """
+    if not value:
+        return None
+
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class HostSlotTimeout(HTTPException):
+    """
+    The host has no free slot within the max wait. The page is not fetched, which is no failure of the page.
+    """
+
+    def __init__(self, url: str, host: str):
+        super().__init__(
+            http.HTTPStatus.SERVICE_UNAVAILABLE, f"url: {url} -> host {host} is throttled"
+        )
+
+
+@dataclass
+class HostState:
+    # current requests pro second, lowered on throttling and restored step by step on success
+    rate: float
+
+    # available tokens of the bucket
+    tokens: float
+
+    updated: float
+
+    in_flight: int = 0
+
+    # no request is sent to the host before this time (monotonic clock)
+    blocked_until: float = 0.0
+
+
+class HostScheduler:
+    """
+    Politeness scheduler shared by all fetchers.
+
+    Every host has a token bucket refilled with `rate` tokens pro second up to `burst` tokens and a limit of
+    requests in flight. A request waits until the host has a free slot and a token, other hosts are not
+    affected by the waiting. On 429 and 503 responses the rate of the host is halved (down to `min_rate`) and
+    the host is paused for the time given by Retry-After, successful responses restore the rate step by step.
+    """
+
+    rate_default = 2.0
+    burst_default = 4
+    max_in_flight_default = 2
+    min_rate_default = 0.1
+    max_wait_default = 60
+    retry_after_max_default = 600
+
+    # part of the configured rate restored after every successful response
+    recovery_step = 0.1
+
+    # seconds between the evictions of idle hosts
+    evict_interval = 60
+
+    def __init__(self, settings: dict):
+        self.settings = settings
+
+        politeness_settings = settings["main"].get("fetch", {}).get("politeness", {})
+        self.rate = float(politeness_settings.get("rate", self.rate_default))
+        self.burst = politeness_settings.get("burst", self.burst_default)
+        self.max_in_flight = politeness_settings.get(
+            "max_in_flight", self.max_in_flight_default
+        )
+        self.min_rate = float(
+            politeness_settings.get("min_rate", self.min_rate_default)
+        )
+        self.max_wait = politeness_settings.get("max_wait", self.max_wait_default)
+        self.retry_after_max = politeness_settings.get(
+            "retry_after_max", self.retry_after_max_default
+        )
+
+        self.hosts = {}
+        self.condition = threading.Condition()
+        self.evicted_at = time.monotonic()
+
+    def _get_state(self, host: str, now: float) -> HostState:
+        state = self.hosts.get(host)
+        if state is None:
+            state = HostState(rate=self.rate, tokens=self.burst, updated=now)
+            self.hosts[host] = state
+        return state
+
+    def _refill(self, state: HostState, now: float) -> None:
+        state.tokens = min(self.burst, state.tokens + (now - state.updated) * state.rate)
+        state.updated = now
+
+    def _evict_idle_hosts(self, now: float) -> None:
+        # a host with a full bucket, the configured rate, no request in flight and no pause is the same as
+        # a new one, its state is dropped so that the hosts do not grow with every fetched domain
+        if now - self.evicted_at < self.evict_interval:
+            return
+        self.evicted_at = now
+
+        for host, state in list(self.hosts.items()):
+            self._refill(state, now)
+            if (
+                state.in_flight == 0
+                and state.blocked_until <= now
+                and state.tokens >= self.burst
+                and state.rate >= self.rate
+            ):
+                del self.hosts[host]
+
+    @contextmanager
+    def slot(self, url: str):
+        """
+        Wait for a free slot of the host of the url and hold it while the request is running.
+
+        Raises:
+            HostSlotTimeout: the host has no free slot within max_wait seconds
+        """
+        host = get_domain_name_from_url(url)
+        deadline = time.monotonic() + self.max_wait
+
+        with self.condition:
+            self._evict_idle_hosts(time.monotonic())
+
+            while True:
+                now = time.monotonic()
+                state = self._get_state(host, now)
+                self._refill(state, now)
+
+                if state.blocked_until > now:
+                    wait = state.blocked_until - now
+                elif state.in_flight >= self.max_in_flight:
+                    # woken up by a finished request of the host
+                    wait = None
+                elif state.tokens < 1:
+                    wait = (1 - state.tokens) / state.rate
+                else:
+                    state.tokens -= 1
+                    state.in_flight += 1
+                    break
+
+                remaining = deadline - now
+                if remaining <= 0:
+                    raise HostSlotTimeout(url, host)
+
+                self.condition.wait(remaining if wait is None else min(wait, remaining))
+
+        try:
+            yield
+        finally:
+            with self.condition:
+                state.in_flight -= 1
+                self.condition.notify_all()
+
+    def report(self, url: str, status_code: int, retry_after: str | None = None) -> None:
+        """
+        Adapt the rate of the host of the url to the response.
+
+        Args:
+            url: requested url
+            status_code: http status code of the response
+            retry_after: Retry-After header of the response
+
+        Returns: None
+        """
+        host = get_domain_name_from_url(url)
+
+        with self.condition:
+            now = time.monotonic()
+            state = self._get_state(host, now)
+
+            if status_code in throttle_status_codes:
+                state.rate = max(self.min_rate, state.rate / 2)
+                state.tokens = 0
+
+                delay = parse_retry_after(retry_after)
+                if delay is None:
+                    delay = 1 / state.rate
+                delay = min(delay, self.retry_after_max)
+                state.blocked_until = max(state.blocked_until, now + delay)
+
+                logger.warning(
+                    "Host %s throttles with %s, rate is lowered to %s requests pro second, paused for %s seconds",
+                    host,
+                    status_code,
+                    state.rate,
+                    int(delay),
+                )
+            elif status_code < status.HTTP_400_BAD_REQUEST and state.rate < self.rate:
+                state.rate = min(self.rate, state.rate + self.rate * self.recovery_step)
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        with self.condition:
+            return {
+                "hosts": len(self.hosts),
+                "throttled_hosts": {
+                    host: {
+                        "rate": round(state.rate, 3),
+                        "paused_for_seconds": int(max(0.0, state.blocked_until - now)),
+                    }
+                    for host, state in self.hosts.items()
+                    if state.rate < self.rate or state.blocked_until > now
+                },
+            }
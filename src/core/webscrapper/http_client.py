@@ -0,0 +1,132 @@
+import socket
+import threading
+import time
+from collections import OrderedDict
+from http.cookiejar import DefaultCookiePolicy
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.utils.logger import logger
+
+
+class DnsCache:
+    """
+    Keeps results of `socket.getaddrinfo` for a given time to live, so that crawling many pages of the
+    same host does not resolve the host name again for every new connection.
+
+    The cache holds at most `max_entries` entries: expired entries are purged on insert and the least
+    recently used entry is evicted when the cache is full.
+    """
+
+    _installed = None
+    _original_getaddrinfo = socket.getaddrinfo
+
+    def __init__(self, ttl: int, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def getaddrinfo(self, *args, **kwargs):
+        key = (args, tuple(sorted(kwargs.items())))
+        now = time.monotonic()
+
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry and entry[0] > now:
+                self.entries.move_to_end(key)
+                return entry[1]
+
+        result = DnsCache._original_getaddrinfo(*args, **kwargs)
+        with self.lock:
+            self.entries[key] = (now + self.ttl, result)
+            self.entries.move_to_end(key)
+            self._evict(now)
+        return result
+
+    def _evict(self, now: float) -> None:
+        # entries are ordered by their last use, so expired ones are not necessarily at the front
+        for key in [key for key, entry in self.entries.items() if entry[0] <= now]:
+            del self.entries[key]
+
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    @classmethod
+    def install(cls, ttl: int, max_entries: int) -> None:
+        """
+        Install the process wide dns cache. Only the first call installs the cache, later calls are ignored.
+
+        Args:
+            ttl: time to live of resolved addresses in seconds, 0 disables the cache
+            max_entries: max amount of cached results, the least recently used ones are evicted
+
+        Returns: None
+        """
+        if cls._installed is not None or ttl <= 0:
+            return
+
+        cls._installed = cls(ttl, max_entries)
+        socket.getaddrinfo = cls._installed.getaddrinfo
+        logger.info("DNS cache installed with ttl %s seconds and max %s entries", ttl, max_entries)
+
+
+class HttpClient:
+    """
+    Shared http client of all fetchers. Connections are kept alive in a pool pro host and reused
+    between requests, instead of opening a new connection (and TLS handshake) for every page.
+    """
+
+    timeout_default = 15
+    pool_connections_default = 50
+    pool_maxsize_default = 8
+    dns_cache_ttl_default = 300
+    dns_cache_max_entries_default = 10000
+    max_bytes_default = 2 * 1024 * 1024
+    content_types_default = ["text/html", "application/xhtml+xml"]
+
+    def __init__(self, settings: dict):
+        self.settings = settings
+
+        http_settings = settings["main"].get("fetch", {}).get("http", {})
+        self.timeout = http_settings.get("timeout", self.timeout_default)
+        pool_connections = http_settings.get(
+            "pool_connections", self.pool_connections_default
+        )
+        pool_maxsize = http_settings.get("pool_maxsize", self.pool_maxsize_default)
+
+        # bodies are streamed, only accepted content types are read and not more than max_bytes
+        self.max_bytes = http_settings.get("max_bytes", self.max_bytes_default)
+        self.content_types = http_settings.get(
+            "content_types", self.content_types_default
+        )
+
+        DnsCache.install(
+            http_settings.get("dns_cache_ttl", self.dns_cache_ttl_default),
+            http_settings.get("dns_cache_max_entries", self.dns_cache_max_entries_default),
+        )
+
+        # amount of hosts kept in the pool and amount of kept-alive connections pro host
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections, pool_maxsize=pool_maxsize
+        )
+
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        # pages are fetched independently of each other, don't carry cookies from one site to another
+        self.session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+
+    def get(self, url: str, headers: dict = None, **kwargs) -> requests.Response:
+        return self.session.get(
+            url,
+            timeout=self.timeout,
+            headers=headers,
+            allow_redirects=True,
+            **kwargs,
+        )
+
+    def close(self) -> None:
+        self.session.close()
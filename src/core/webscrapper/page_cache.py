@@ -0,0 +1,181 @@
+import os
+import posixpath
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+
+from src.core.helper.url import normalize_url
+from src.core.webscrapper.fetch_result import hash_content
+from src.utils.logger import logger
+
+
+@dataclass
+class CachedPage:
+    url: str
+    content_hash: str
+    etag: str | None
+    last_modified: str | None
+    fetched_at: float
+
+
+class PageCache:
+    """
+    On-disk cache of fetched pages, keyed by normalized url.
+
+    Bodies are stored zlib compressed in files named by their content hash, so the same content of different
+    urls is stored only once. The index (pages and blobs) is kept in a sqlite database in the cache directory,
+    which can be shared between the api and the cron jobs.
+
+    - pages fetched within `ttl` seconds are served without asking the origin
+    - older pages are revalidated with a conditional request (ETag / Last-Modified)
+    - blobs are evicted least recently used first, when all blobs take more than `max_bytes`
+    """
+
+    curr_dir = os.path.dirname(__file__)
+
+    dir_default = "cache"
+    max_bytes_default = 512 * 1024 * 1024
+    ttl_default = 3600
+    compress_level = 6
+
+    def __init__(self, settings: dict):
+        self.settings = settings
+
+        cache_settings = settings["main"].get("fetch", {}).get("cache", {})
+        self.max_bytes = cache_settings.get("max_bytes", self.max_bytes_default)
+        self.ttl = cache_settings.get("ttl", self.ttl_default)
+
+        self.cache_dir = posixpath.normpath(
+            os.path.join(
+                self.curr_dir, "../..", cache_settings.get("dir", self.dir_default)
+            )
+        )
+        self.blobs_dir = os.path.join(self.cache_dir, "blobs")
+        os.makedirs(self.blobs_dir, exist_ok=True)
+
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(
+            os.path.join(self.cache_dir, "index.sqlite"),
+            timeout=30,
+            check_same_thread=False,
+            isolation_level=None,
+        )
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS pages (url TEXT PRIMARY KEY, content_hash TEXT NOT NULL, etag TEXT, "
+            "last_modified TEXT, fetched_at REAL NOT NULL)"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS blobs (content_hash TEXT PRIMARY KEY, size INTEGER NOT NULL, "
+            "last_access REAL NOT NULL)"
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_blobs_last_access ON blobs (last_access)"
+        )
+
+    def get(self, url: str) -> CachedPage | None:
+        key = normalize_url(url)
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT url, content_hash, etag, last_modified, fetched_at FROM pages WHERE url = ?",
+                (key,),
+            ).fetchone()
+        return CachedPage(*row) if row else None
+
+    def is_fresh(self, page: CachedPage) -> bool:
+        return time.time() - page.fetched_at < self.ttl
+
+    def read_body(self, page: CachedPage) -> str | None:
+        try:
+            with open(self._blob_path(page.content_hash), "rb") as f:
+                body = zlib.decompress(f.read()).decode("utf-8")
+        except (OSError, zlib.error) as e:
+            logger.error("cached page cannot be read %s: %s", page.url, str(e))
+            return None
+
+        with self.lock:
+            self.conn.execute(
+                "UPDATE blobs SET last_access = ? WHERE content_hash = ?",
+                (time.time(), page.content_hash),
+            )
+        return body
+
+    def revalidated(self, page: CachedPage) -> None:
+        """
+        Register that the origin has confirmed (not modified) the cached page.
+        """
+        with self.lock:
+            self.conn.execute(
+                "UPDATE pages SET fetched_at = ? WHERE url = ?",
+                (time.time(), page.url),
+            )
+
+    def put(
+        self, url: str, body: str, etag: str | None, last_modified: str | None
+    ) -> str:
+        key = normalize_url(url)
+        content_hash = hash_content(body)
+        blob_path = self._blob_path(content_hash)
+        now = time.time()
+
+        if not os.path.isfile(blob_path):
+            os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+            tmp_path = f"{blob_path}.{os.getpid()}.{threading.get_ident()}"
+            with open(tmp_path, "wb") as f:
+                f.write(zlib.compress(body.encode("utf-8"), self.compress_level))
+            os.replace(tmp_path, blob_path)
+
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT content_hash FROM pages WHERE url = ?", (key,)
+            ).fetchone()
+            self.conn.execute(
+                "INSERT OR REPLACE INTO pages (url, content_hash, etag, last_modified, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, content_hash, etag, last_modified, now),
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO blobs (content_hash, size, last_access) VALUES (?, ?, ?)",
+                (content_hash, os.path.getsize(blob_path), now),
+            )
+
+            if row and row[0] != content_hash:
+                self._delete_blob_if_unused(row[0])
+
+            self._evict()
+
+        return content_hash
+
+    def _evict(self) -> None:
+        (total,) = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()
+        if total <= self.max_bytes:
+            return
+
+        rows = self.conn.execute(
+            "SELECT content_hash, size FROM blobs ORDER BY last_access"
+        ).fetchall()
+        for content_hash, size in rows:
+            if total <= self.max_bytes:
+                break
+            self.conn.execute("DELETE FROM pages WHERE content_hash = ?", (content_hash,))
+            self._delete_blob(content_hash)
+            total -= size
+
+    def _delete_blob_if_unused(self, content_hash: str) -> None:
+        row = self.conn.execute(
+            "SELECT 1 FROM pages WHERE content_hash = ? LIMIT 1", (content_hash,)
+        ).fetchone()
+        if not row:
+            self._delete_blob(content_hash)
+
+    def _delete_blob(self, content_hash: str) -> None:
+        self.conn.execute("DELETE FROM blobs WHERE content_hash = ?", (content_hash,))
+        try:
+            os.remove(self._blob_path(content_hash))
+        except FileNotFoundError:
+            pass
+
+    def _blob_path(self, content_hash: str) -> str:
+        return os.path.join(self.blobs_dir, content_hash[:2], f"{content_hash}.z")
@@ -1,10 +1,19 @@
-from typing import Final
+from contextlib import nullcontext
 
-import requests
 from fake_useragent import UserAgent
 from starlette import status
 
 from src.core.webscrapper import log_and_raise_compact_err
+from src.core.webscrapper.body_reader import (
+    detect_charset,
+    parse_content_type,
+    read_body,
+)
+from src.core.webscrapper.fetch_result import FetchResult
+from src.core.webscrapper.host_scheduler import HostScheduler, HostSlotTimeout
+from src.core.webscrapper.http_client import HttpClient
+from src.core.webscrapper.page_cache import CachedPage, PageCache
+from src.utils.logger import logger
 
 
 class RequestsScrapper:
@@ -21,18 +30,127 @@ class RequestsScrapper:
         "Cache-Control": "no-cache",
     }
 
-    # TODO config???
-    timeout: Final[int] = 15
     errors_handling: str = "ignore"
 
-    def fetch(self, url: str) -> str:
+    def __init__(
+        self,
+        client: HttpClient,
+        cache: PageCache | None = None,
+        scheduler: HostScheduler | None = None,
+    ):
+        self.client = client
+        self.cache = cache
+        self.scheduler = scheduler
+
+    def fetch(self, url: str) -> FetchResult:
         try:
-            self.headers["User-Agent"] = self.ua.random
-            response = requests.get(
-                url, timeout=self.timeout, headers=self.headers, allow_redirects=True
+            cached_page = self.cache.get(url) if self.cache else None
+            if cached_page and self.cache.is_fresh(cached_page):
+                if result := self._from_cache(url, cached_page):
+                    return result
+
+            # copy default headers pro request, the fetch is called from many threads at once
+            headers = {**self.headers, "User-Agent": self.ua.random}
+            if cached_page:
+                headers.update(self._conditional_headers(cached_page))
+
+            # the slot of the host is held until the body is read or aborted
+            with self._host_slot(url):
+                response = self._get(url, headers)
+
+                if response.status_code == status.HTTP_304_NOT_MODIFIED and cached_page:
+                    response.close()
+                    if result := self._from_cache(url, cached_page):
+                        self.cache.revalidated(cached_page)
+                        return result
+
+                    # the cached body is gone, fetch the page without validators
+                    headers = {**self.headers, "User-Agent": self.ua.random}
+                    response = self._get(url, headers)
+
+                with response:
+                    if response.status_code >= status.HTTP_400_BAD_REQUEST:
+                        raise RuntimeError(f"url: {url} -> {response.reason}")
+
+                    body, truncated = self._read_html(url, response)
+
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+
+            content_hash = None
+            if self.cache:
+                content_hash = self.cache.put(url, body, etag, last_modified)
+
+            return FetchResult(
+                url=url,
+                body=body,
+                etag=etag,
+                last_modified=last_modified,
+                content_hash=content_hash,
+                truncated=truncated,
             )
-            if response.status_code >= status.HTTP_400_BAD_REQUEST:
-                raise RuntimeError(f"url: {url} -> {response.reason}")
-            return response.content.decode("utf-8", errors=self.errors_handling)
+        except HostSlotTimeout:
+            raise
         except Exception as e:
             log_and_raise_compact_err(str(e))
+
+    def _read_html(self, url: str, response) -> tuple[str, bool]:
+        """
+        Read the streamed body of an html response, other content types are aborted before the body is read.
+
+        Returns: decoded body and whether it is truncated
+        """
+        media_type, header_charset = parse_content_type(
+            response.headers.get("Content-Type")
+        )
+        if media_type and media_type not in self.client.content_types:
+            raise RuntimeError(f"url: {url} -> content type {media_type} is not supported")
+
+        content_length = response.headers.get("Content-Length")
+        if content_length and content_length.isdigit() and int(content_length) > self.client.max_bytes > 0:
+            logger.info(
+                "url: %s -> content length %s exceeds %s bytes, the body is truncated",
+                url,
+                content_length,
+                self.client.max_bytes,
+            )
+
+        body, truncated = read_body(response, self.client.max_bytes)
+        charset = detect_charset(body, header_charset)
+        return body.decode(charset, errors=self.errors_handling), truncated
+
+    def _host_slot(self, url: str):
+        if self.scheduler is None:
+            return nullcontext()
+        return self.scheduler.slot(url)
+
+    def _get(self, url: str, headers: dict):
+        response = self.client.get(url, headers=headers, stream=True)
+        if self.scheduler:
+            self.scheduler.report(
+                url, response.status_code, response.headers.get("Retry-After")
+            )
+        return response
+
+    def _from_cache(self, url: str, cached_page: CachedPage) -> FetchResult | None:
+        body = self.cache.read_body(cached_page)
+        if body is None:
+            return None
+
+        return FetchResult(
+            url=url,
+            body=body,
+            etag=cached_page.etag,
+            last_modified=cached_page.last_modified,
+            content_hash=cached_page.content_hash,
+            from_cache=True,
+        )
+
+    @staticmethod
+    def _conditional_headers(cached_page: CachedPage) -> dict:
+        headers = {}
+        if cached_page.etag:
+            headers["If-None-Match"] = cached_page.etag
+        if cached_page.last_modified:
+            headers["If-Modified-Since"] = cached_page.last_modified
+        return headers
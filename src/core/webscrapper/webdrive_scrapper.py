@@ -7,6 +7,9 @@ from selenium.webdriver.firefox.options import Options
 from selenium.webdriver.firefox.service import Service
 
 from src.core.webscrapper import log_and_raise_compact_err
+from src.core.webscrapper.browser_pool import BrowserPool
+from src.core.webscrapper.fetch_result import FetchResult
+from src.core.webscrapper.host_scheduler import HostScheduler, HostSlotTimeout
 from src.utils.logger import logger
 
 
@@ -18,6 +21,31 @@ class WebDriveScrapper:
     script_timeout: Final[int] = 15
     proxy_host = "35.157.186.69:3128"
 
+    lean_default = False
+
+    # only the dom is read, don't load what is needed for rendering the page
+    lean_preferences = {
+        # images: 2 = block
+        "permissions.default.image": 2,
+        # web fonts
+        "gfx.downloadable_fonts.enabled": False,
+        "browser.display.use_document_fonts": 0,
+        # audio and video: 5 = block autoplay of all media, don't preload
+        "media.autoplay.default": 5,
+        "media.preload.default": 0,
+        "media.preload.auto": 0,
+        "media.mediasource.enabled": False,
+    }
+
+    def __init__(self, settings: dict, scheduler: HostScheduler | None = None):
+        self.settings = settings
+        self.scheduler = scheduler
+
+        browser_settings = settings["main"].get("fetch", {}).get("browser", {})
+        self.lean = browser_settings.get("lean", self.lean_default)
+
+        self.pool = BrowserPool(settings, self.create_driver)
+
     def init_ff_driver(self, **kwargs) -> webdriver.Firefox:
         user_agent = self.ua.random
         logger.info("UserAgent: %s", user_agent)
@@ -28,6 +56,8 @@ class WebDriveScrapper:
         ff_options.add_argument(f"--user-agent={user_agent}")
         ff_options.add_argument("--disable-web-security")
         ff_options.add_argument("--disable-extensions")
+        # the browser pool clears the data of all origins in the privileged context after every lease
+        ff_options.add_argument("-remote-allow-system-access")
 
         ff_profile = FirefoxProfile()
         if kwargs.get("proxy", False):
@@ -46,6 +76,14 @@ class WebDriveScrapper:
         ff_profile.set_preference("media.peerconnection.enabled", False)
         ff_profile.set_preference("useAutomationExtension", False)
         ff_profile.set_preference("general.useragent.override", user_agent)
+
+        if self.lean:
+            for name, value in self.lean_preferences.items():
+                ff_profile.set_preference(name, value)
+
+            # return as soon as the dom is interactive, don't wait for the load event
+            ff_options.page_load_strategy = "eager"
+
         ff_profile.update_preferences()
 
         ff_options.profile = ff_profile
@@ -59,17 +97,26 @@ class WebDriveScrapper:
         )
         return driver
 
-    def fetch(self, url: str) -> str:
-        driver = None
+    def create_driver(self) -> webdriver.Firefox:
+        driver = self.init_ff_driver()
+        driver.set_script_timeout(self.script_timeout)
+        driver.set_page_load_timeout(self.pageload_timeout)
+        return driver
+
+    def stats(self) -> dict:
+        return self.pool.stats()
+
+    def fetch(self, url: str) -> FetchResult:
         try:
-            driver = self.init_ff_driver()
-            driver.set_script_timeout(self.script_timeout)
-            driver.set_page_load_timeout(self.pageload_timeout)
-            driver.get(url)
-            return driver.page_source
+            with self.pool.lease() as driver:
+                # the browser gives no status code, only the slot of the host is taken
+                if self.scheduler:
+                    with self.scheduler.slot(url):
+                        driver.get(url)
+                else:
+                    driver.get(url)
+                return FetchResult(url=url, body=driver.page_source)
+        except HostSlotTimeout:
+            raise
         except Exception as e:
             log_and_raise_compact_err(str(e))
-        finally:
-            if driver:
-                driver.close()
-                driver.quit()
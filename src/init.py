@@ -3,7 +3,12 @@
 import argparse
 
 from src.core.manager.sql_mgr import SqlMgr
-from src.utils.init import init_domainqueries, init_resources, init_users
+from src.utils.init import (
+    init_documents,
+    init_domainqueries,
+    init_resources,
+    init_users,
+)
 from src.utils.logger import logger
 from src.utils.settings import read_settings, read_version
 
@@ -28,6 +33,9 @@ def main():
         logger.info("Restore records")
         SqlMgr.restore_records()
 
+    logger.info("Initialize documents of resources")
+    init_documents()
+
     logger.info("Initialize domain queries")
     init_domainqueries(settings)
 
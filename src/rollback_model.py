@@ -0,0 +1,43 @@
+#!/usr/bin/python
+
+import argparse
+
+from src.utils.classifier import get_classifier
+from src.utils.logger import logger
+from src.utils.settings import read_settings
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--settings", action="store", default="development.yaml")
+    parser.add_argument("--version", action="store", default=None)
+    parser.add_argument("--list", action="store_true", default=False)
+    args = parser.parse_args()
+
+    # read settings
+    settings = read_settings(args.settings)
+
+    # the registry of the configured mode, no model is loaded
+    registry = get_classifier(settings, None).registry
+
+    if args.list:
+        pointer = registry.get_pointer()
+        for version in registry.versions():
+            meta = registry.get_meta(version)
+            marker = "current" if version == pointer.get("current") else ""
+            marker = marker or ("previous" if version == pointer.get("previous") else "")
+            logger.info("%s %s %s %s", version, meta["created"], meta["metadata"], marker)
+        return
+
+    if args.version:
+        registry.activate(args.version)
+        version = args.version
+    else:
+        version = registry.rollback()
+
+    # running apps swap the model in with the next check of the registry
+    logger.info("Model version %s of mode %s is current", version, registry.mode)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+#!/usr/bin/python
+
+import argparse
+
+import nltk
+
+from src.core.manager.tokenization_mgr import get_nltk_data_dir, nltk_corpora
+from src.utils.settings import read_settings
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--settings", action="store", default="development.yaml")
+    args = parser.parse_args()
+
+    # read settings
+    settings = read_settings(args.settings)
+
+    # download the corpora once to the local data directory, the application never downloads them
+    nltk_data_dir = get_nltk_data_dir(settings)
+    for corpus in nltk_corpora:
+        if not nltk.download(corpus, download_dir=nltk_data_dir, raise_on_error=True):
+            raise RuntimeError(f"nltk corpus {corpus} cannot be downloaded to {nltk_data_dir}")
+
+
+if __name__ == "__main__":
+    main()
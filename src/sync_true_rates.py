@@ -2,10 +2,12 @@
 
 import argparse
 
+from src.core.classifier.classifier import ClassifierType
 from src.core.manager.sql_mgr import SqlMgr
 from src.utils.init import init_resources
 from src.utils.logger import logger
 from src.utils.settings import read_settings
+from src.utils.train import init_train
 
 
 def main():
@@ -21,6 +23,14 @@ def main():
     init_resources(settings, update=True)
     logger.info("Finished updating resources true-rates")
 
+    # the online model learns the updated true-rates right away
+    if (
+        settings["model"].get("mode") == ClassifierType.HashTxClassifier.value
+        and settings["model"]["train"]["status"]
+    ):
+        logger.info("Fold updated true-rates into the model")
+        init_train(settings)
+
 
 if __name__ == "__main__":
     main()
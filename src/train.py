@@ -11,9 +11,13 @@ from src.utils.train import init_train
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--settings", action="store", default="development.yaml")
+    parser.add_argument("--full", action="store_true", default=False)
     args = parser.parse_args()
 
     settings = read_settings(args.settings)
+    if args.full:
+        # incremental modes train from scratch as well
+        settings["model"]["train"]["full"] = True
     version = read_version()
 
     if not settings["model"]["train"]["status"]:
@@ -0,0 +1,50 @@
+import time
+from typing import Callable
+
+import numpy as np
+
+
+def measure(func: Callable, *args, **kwargs) -> tuple:
+    """
+    Call the function once and measure the wall-clock time.
+
+    Returns: result of the call and the elapsed time in seconds
+    """
+    started = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - started
+
+
+def report(name: str, latencies: list) -> dict:
+    """
+    Summarize measured latencies and print them.
+
+    Args:
+        name: name of the measured implementation
+        latencies: measured latencies in seconds
+
+    Returns: summary as dict-object
+    """
+    values = np.asarray(latencies) if latencies else np.zeros(1)
+    summary = {
+        "name": name,
+        "calls": len(latencies),
+        "total": float(values.sum()),
+        "p50": float(np.percentile(values, 50)),
+        "p99": float(np.percentile(values, 99)),
+    }
+    print(
+        "{name:<30} calls: {calls:>7}  total: {total:>10.4f}s  p50: {p50_ms:>9.3f}ms  p99: {p99_ms:>9.3f}ms".format(
+            p50_ms=summary["p50"] * 1000, p99_ms=summary["p99"] * 1000, **summary
+        )
+    )
+    return summary
+
+
+def report_speedup(baseline: dict, candidate: dict) -> None:
+    if candidate["total"] > 0:
+        print(
+            "speed-up of {} against {}: {:.2f}x".format(
+                candidate["name"], baseline["name"], baseline["total"] / candidate["total"]
+            )
+        )
@@ -16,6 +16,14 @@ def get_classifier(settings: dict, resource_mgr: ResourceMgr):
         from src.core.classifier.dl_tx_cnn_classifier import DLTxCNNClassifier
 
         classifier = DLTxCNNClassifier(settings, resource_mgr)
+    elif mode == ClassifierType.LinearTxClassifier.value:
+        from src.core.classifier.linear_tx_classifier import LinearTxClassifier
+
+        classifier = LinearTxClassifier(settings, resource_mgr)
+    elif mode == ClassifierType.HashTxClassifier.value:
+        from src.core.classifier.hash_tx_classifier import HashTxClassifier
+
+        classifier = HashTxClassifier(settings, resource_mgr)
     else:
         raise NotImplementedError(f"This training mode is not implemented: {mode}")
     return classifier
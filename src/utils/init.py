@@ -54,7 +54,10 @@ def init_domainqueries(settings: dict):
 
 
 def init_resources(settings: dict, update: bool = False):
-    feature_extract_mgr = FeatureExtractMgr(settings, TokenizationMgr(settings))
+    token_mgr = TokenizationMgr(settings)
+    token_mgr.warm_up()
+
+    feature_extract_mgr = FeatureExtractMgr(settings, token_mgr)
     resource_mgr = ResourceMgr(settings, feature_extract_mgr, DomainQueryMgr(settings))
 
     logger.info("Read data source files in mode: %s ", "update" if update else "init")
@@ -80,10 +83,19 @@ def init_resources(settings: dict, update: bool = False):
     sess.close()
 
 
+def init_documents():
+    sess = SqlMgr.create_session()
+    ResourceMgr.fill_missing_documents(sess)
+    sess.commit()
+    sess.close()
+
+
 def init_tasks(settings: dict) -> TaskApi:
     SqlMgr.init(settings, initial_table=False)
 
     app_token_mgr = TokenizationMgr(settings)
+    app_token_mgr.warm_up()
+
     app_feature_extract_mgr = FeatureExtractMgr(
         settings,
         app_token_mgr,
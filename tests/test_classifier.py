@@ -0,0 +1,34 @@
+import numpy as np
+from scipy import sparse
+
+from src.core.classifier.classifier import Classifier
+
+
+def get_top_positions_dense(row: np.ndarray, qty: int) -> list:
+    # reversed stable argsort over the dense row
+    return [index for index in np.argsort(row, kind="stable")[::-1][:qty] if row[index] != 0.0]
+
+
+def test_top_positions_ties_are_ordered_by_column_descending():
+    row = np.array([0.0, 0.5, 0.2, 0.5, 0.0, 0.2, 0.2, 0.9, 0.2])
+    sparse_row = sparse.csr_matrix(row)
+
+    for qty in range(1, 9):
+        positions = Classifier.get_top_positions(sparse_row.data, sparse_row.indices, qty)
+
+        assert list(sparse_row.indices[positions]) == get_top_positions_dense(row, qty)
+
+    # the tie at the cut-off keeps the highest columns
+    positions = Classifier.get_top_positions(sparse_row.data, sparse_row.indices, 4)
+    assert list(sparse_row.indices[positions]) == [7, 3, 1, 8]
+
+
+def test_top_positions_of_random_rows_with_ties():
+    rng = np.random.default_rng(7)
+    for _ in range(100):
+        row = rng.integers(0, 4, size=60) / 4
+        sparse_row = sparse.csr_matrix(row)
+
+        positions = Classifier.get_top_positions(sparse_row.data, sparse_row.indices, 25)
+
+        assert list(sparse_row.indices[positions]) == get_top_positions_dense(row, 25)
@@ -0,0 +1,102 @@
+import time
+
+import pytest
+
+from src.core.entity.page_item import PageItem
+from src.core.featureextractor.html_extractor import HtmlDocument
+from src.core.webscrapper import crawler as crawler_module
+from src.core.webscrapper.crawler import Crawler
+from src.core.webscrapper.fetch_result import FetchResult
+
+settings = {"main": {"task": {"crawler": {"concurrency": 1}}}}
+
+# links pro page of the crawled site
+site = {
+    "http://a.com/": ["http://a.com/1", "http://a.com/2", "http://a.com/3", "http://a.com/4"],
+    "http://a.com/1": ["http://a.com/", "http://a.com/1/1"],
+    "http://a.com/2": ["http://a.com/2/1"],
+    "http://a.com/3": [],
+    "http://a.com/4": [],
+}
+
+
+@pytest.fixture
+def fetched_urls(monkeypatch):
+    fetched_urls = []
+
+    def get_content_by_val_and_collect_links(fetch, url, collect_links):
+        fetched_urls.append(url)
+        fetch(url)
+        return FetchResult(url=url, body=""), HtmlDocument(), site.get(url, [])
+
+    monkeypatch.setattr(
+        crawler_module,
+        "get_content_by_val_and_collect_links",
+        get_content_by_val_and_collect_links,
+    )
+    return fetched_urls
+
+
+def get_crawler(fetch_seconds: float = 0.0) -> Crawler:
+    return Crawler(settings, [{"name": "test", "fetch": lambda url: time.sleep(fetch_seconds)}])
+
+
+def get_skipped(page_item: PageItem) -> list:
+    skipped = [page_item.link] if page_item.skipped else []
+    for page_item_new in page_item.pages:
+        skipped += get_skipped(page_item_new)
+    return skipped
+
+
+def test_nothing_skipped_within_budgets(fetched_urls):
+    root_page_item = PageItem(link="http://a.com/")
+    fetched_pages = get_crawler().crawl(root_page_item, 2)
+
+    assert len(fetched_pages) == 5
+    assert get_skipped(root_page_item) == []
+
+    # pages on max depth are referenced, but not fetched
+    assert [page_item.link for page_item in root_page_item.pages[0].pages] == [
+        "http://a.com/",
+        "http://a.com/1/1",
+    ]
+    assert "http://a.com/1/1" not in fetched_urls
+
+
+def test_time_budget_skips_scheduled_pages(fetched_urls):
+    root_page_item = PageItem(link="http://a.com/")
+    get_crawler(fetch_seconds=1.2).crawl(root_page_item, 2, time_budget=1)
+
+    assert fetched_urls == ["http://a.com/"]
+    assert get_skipped(root_page_item) == [
+        "http://a.com/1",
+        "http://a.com/2",
+        "http://a.com/3",
+        "http://a.com/4",
+    ]
+
+
+def test_time_budget_does_not_skip_pages_on_max_depth(fetched_urls):
+    root_page_item = PageItem(link="http://a.com/")
+    get_crawler(fetch_seconds=1.2).crawl(root_page_item, 1, time_budget=1)
+
+    assert fetched_urls == ["http://a.com/"]
+    assert len(root_page_item.pages) == 4
+    assert get_skipped(root_page_item) == []
+
+
+def test_page_budget_skips_pages_beyond(fetched_urls):
+    root_page_item = PageItem(link="http://a.com/")
+    fetched_pages = get_crawler().crawl(root_page_item, 2, page_budget=3)
+
+    assert len(fetched_pages) == 3
+    assert fetched_urls == ["http://a.com/", "http://a.com/1", "http://a.com/2"]
+
+    # pages beyond the budget stay in the tree
+    assert [page_item.link for page_item in root_page_item.pages] == site["http://a.com/"]
+    assert get_skipped(root_page_item) == [
+        "http://a.com/1/1",
+        "http://a.com/2/1",
+        "http://a.com/3",
+        "http://a.com/4",
+    ]
@@ -0,0 +1,113 @@
+import pytest
+from bs4 import BeautifulSoup
+
+from src.core.featureextractor.default_resource import DefaultResource
+from src.core.featureextractor.html_extractor import extract_document, link_href
+
+
+def legacy_collect_features(body: str) -> tuple:
+    # the former BeautifulSoup (html.parser) extraction, the reference of extract_document
+    content = BeautifulSoup(body, "html.parser")
+
+    lang = None
+    element = content.find("html")
+    if element and element.get("lang"):
+        lang = element.get("lang")
+    else:
+        for element in content.find_all("meta"):
+            if element.get("property") == "og:locale":
+                lang = element.get("content")
+                break
+
+    checked_lang = None
+    if lang:
+        lang = lang.split("_")[0] if lang.find("_") != -1 else lang.split("-")[0]
+        checked_lang = DefaultResource.lang_codes.get(lang)
+
+    features = []
+    if elements := content.find_all("title"):
+        features.append(elements[0].get_text())
+
+    for element in content.find_all("meta"):
+        if element.get("name") in ["description", "keywords"] and element.get("content"):
+            features.append(element.get("content"))
+        if element.get("property") in ["og:description", "og:title"] and element.get("content"):
+            features.append(element.get("content"))
+
+    for num in range(1, 4):
+        features += [element.get_text() for element in content.find_all("h" + str(num))]
+
+    ahrefs = [element.text for element in content.find_all("a") if element.text and element.text.strip()]
+    if ahrefs:
+        features.append(" ".join(ahrefs[: DefaultResource.limit_ahref]))
+
+    links = []
+    for link in content.find_all("a", attrs={"href": link_href}):
+        href = link.get("href")
+        if href not in links:
+            links.append(href)
+
+    return checked_lang or DefaultResource.default_lang, features, links
+
+
+def fast_collect_features(body: str) -> tuple:
+    document = extract_document(body)
+    feature_extractor = DefaultResource()
+    lang = feature_extractor.get_lang_from_content(document)
+    return lang, feature_extractor.collect_features(document), document.links
+
+
+page = """
+<html lang="de-DE">
+<head>
+    <title>Page title</title>
+    <meta name="description" content="Page description">
+    <meta property="og:title" content="Open graph title">
+</head>
+<body>
+    <h1>Header <span>one</span></h1>
+    <h2>Header two<script>var x = 1;</script></h2>
+    <a href="https://example.com/a">First link</a>
+    <a href="/relative">Relative link</a>
+    <a href="https://example.com/a">First link again</a>
+</body>
+</html>
+"""
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        page,
+        "<html><head><title>My <b>bold</b> title</title></head></html>",
+        "<html><head><title>a < b &amp; c</title></head></html>",
+        "",
+    ],
+)
+def test_same_as_bs4(body):
+    assert fast_collect_features(body) == legacy_collect_features(body)
+
+
+def test_nested_anchor_is_closed():
+    body = '<a href="http://a.com/1">one <a href="http://a.com/2">two</a> three</a>'
+
+    _, legacy_features, legacy_links = legacy_collect_features(body)
+    _, features, links = fast_collect_features(body)
+
+    assert legacy_features == ["one two three two"]
+    assert features == ["one  two"]
+    assert links == legacy_links
+
+
+def test_paragraph_closes_header():
+    body = "<h1>Head <p>para</h1><h2>Sub</h2>"
+
+    assert legacy_collect_features(body)[1] == ["Head para", "Sub"]
+    assert fast_collect_features(body)[1] == ["Head ", "Sub"]
+
+
+def test_textarea_content_is_text():
+    body = '<textarea>some <a href="http://a.com/x">text</a></textarea><a href="http://a.com/y">y</a>'
+
+    assert legacy_collect_features(body)[1:] == (["text y"], ["http://a.com/x", "http://a.com/y"])
+    assert fast_collect_features(body)[1:] == (["y"], ["http://a.com/y"])